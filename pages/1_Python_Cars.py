@@ -1,129 +1,122 @@
 import streamlit as st
-import pandas as pd
+
+from python_ag.instrumentation import instrument_page
+from python_ag.page_data import CARS_INDEX, load_cars_index, refresh_warning
+from python_ag.result_cache import shared_cache
 
 # Configuração inicial do app
 st.set_page_config(page_title="Python Cars 🐍",
                     layout="wide")
-
-# Título do aplicativo
-st.title('🚗 Dashboard de Vendas - Veículos Seminovos')
-
-# Carrega os dados do arquivo CSV
-@st.cache_data
-
-def load_data():
-    url = "https://raw.githubusercontent.com/fabiobaroliveira/python_automotive_group/main/pages/vendas_loja_seminovos.csv"
-    try:
-        return pd.read_csv(url, sep=";")
-    except Exception as e:
-        st.error(f"Erro ao carregar dados: {str(e)}")
-        return pd.DataFrame()
-
-df = load_data()
-
-# Sidebar para filtros
-with st.sidebar:
-    st.header("Filtros")
-    
-    marca_selecionada = st.multiselect(
-        "Selecione uma ou mais marcas:",
-        options=sorted(df['Marca'].unique())
-    )
-
-    modelo_selecionado = st.multiselect(
-        "Selecione um ou mais modelos:",
-        options=sorted(df['Modelo'].unique())
-    )
-
-    estado_selecionado = st.multiselect(
-        "Selecione um ou mais estados:",
-        options=sorted(df['Estado'].unique())
-    )
-
-    lead_selecionado = st.multiselect(
-        "Selecione um ou mais canais de lead:",
-        options=sorted(df['Origem_lead'].unique())
-    )
-
-# Aplica os filtros
-df_filtrado = df.copy()
-
-if marca_selecionada:
-    df_filtrado = df_filtrado[df_filtrado['Marca'].isin(marca_selecionada)]
-if modelo_selecionado:
-    df_filtrado = df_filtrado[df_filtrado['Modelo'].isin(modelo_selecionado)]
-if estado_selecionado:
-    df_filtrado = df_filtrado[df_filtrado['Estado'].isin(estado_selecionado)]
-if lead_selecionado:
-    df_filtrado = df_filtrado[df_filtrado['Origem_lead'].isin(lead_selecionado)]
-
-# Resumo dos filtros aplicados
-st.write("**Filtros aplicados:**")
-st.write(f"**Marcas**: {', '.join(marca_selecionada) if marca_selecionada else 'Todas'} | "
-         f"**Modelos**: {', '.join(modelo_selecionado) if modelo_selecionado else 'Todos'}")
-st.write(f"**Estados**: {', '.join(estado_selecionado) if estado_selecionado else 'Todos'} | "
-         f"**Leads**: {', '.join(lead_selecionado) if lead_selecionado else 'Todos'}")
-st.write(f"**Total de veículos vendidos:** {len(df_filtrado)}")
-
-# Visualizações Seção de análise por marca (sempre visível)
-st.subheader("Vendas por Marca")
-if marca_selecionada:
-    # Se há marcas selecionadas, mostra apenas as selecionadas
-    vendas_por_marca = df_filtrado.groupby("Marca").size()
-else:
-    # Se nenhuma marca selecionada, mostra todas
-    vendas_por_marca = df_filtrado.groupby("Marca").size()
-
-st.bar_chart(vendas_por_marca, 
-            x_label="Unidades Vendidas", 
-            color="#494C3A", 
-            horizontal=True)
-
-# Seção de análise por modelo
-st.subheader("Vendas por Modelo")
-vendas_por_modelo = df_filtrado.groupby("Modelo").size()
-
-if modelo_selecionado:
-    # Se há estados selecionados, mostra apenas os selecionados
-    vendas_por_modelo = df_filtrado.groupby("Modelo").size()
-else:
-    # Se nenhum estado selecionado, mostra todos
-    vendas_por_modelo = df_filtrado.groupby("Modelo").size()
-
-st.bar_chart(vendas_por_modelo,
-                color="#494C3A",
-                horizontal=True,
-                use_container_width=True)    
-
-# Seção de análise por estado
-st.subheader("Vendas por Estado")
-if estado_selecionado:
-    # Se há estados selecionados, mostra apenas os selecionados
-    vendas_por_estado = df_filtrado.groupby("Estado").size()
-else:
-    # Se nenhum estado selecionado, mostra todos
-    vendas_por_estado = df_filtrado.groupby("Estado").size()
-
-st.bar_chart(vendas_por_estado, 
-            x_label="Unidades Vendidas", 
-            color="#494C3A", 
-            horizontal=True)
-
-# Seção de análise por Canal
-st.subheader("Vendas por Lead")
-if lead_selecionado:
-    # Se há estados selecionados, mostra apenas os selecionados
-    vendas_por_lead = df_filtrado.groupby("Origem_lead").size()
-else:
-    # Se nenhum estado selecionado, mostra todos
-    vendas_por_lead = df_filtrado.groupby("Origem_lead").size()
-
-st.bar_chart(vendas_por_lead, 
-            x_label="Unidades Vendidas", 
-            color="#494C3A", 
-            horizontal=True)
-
-
-# Rodapé
-st.markdown("---")
-st.markdown("Python Cars 🐍 - Dados fictícios gerados para fins didáticos")
+with instrument_page("Python Cars") as perf:
+    # Título do aplicativo
+    st.title('🚗 Dashboard de Vendas - Veículos Seminovos')
+
+    # Índice de filtros do processo, compartilhado entre sessões e atualizado em
+    # segundo plano (ver page_data). Só a primeira carga pode falhar aqui
+    with perf.span("carga"):
+        try:
+            indice = load_cars_index()
+        except Exception as e:
+            st.error(f"Erro ao carregar dados: {str(e)}")
+            st.stop()
+    perf.track("indice_vendas", indice)
+    refresh_warning(CARS_INDEX)
+
+    # Filtros escolhidos no rerun anterior (os widgets ainda não foram desenhados)
+    filtros = {
+        'Marca': "filtro_marca",
+        'Modelo': "filtro_modelo",
+        'Estado': "filtro_estado",
+        'Origem_lead': "filtro_lead",
+    }
+    selecoes = {col: st.session_state.get(chave, []) for col, chave in filtros.items()}
+
+    # Aplica os filtros, conta as vendas por marca, modelo, estado e lead e calcula,
+    # para cada opção da sidebar, quantas vendas ela teria com os demais filtros.
+    # O resultado fica no cache do processo, por versão dos dados e filtros
+    with perf.span("filtros"):
+        total_vendido, vendas, facetas = shared_cache().get_or_compute(
+            "vendas_loja_seminovos", indice.version, selecoes, lambda: indice.facets(selecoes)
+        )
+
+    def opcoes_facetadas(col):
+        # Esconde opções sem vendas, mas mantém as já selecionadas
+        faceta = facetas[col]
+        return [v for v in faceta.index if faceta[v] > 0 or v in selecoes[col]]
+
+    def rotulo(col):
+        return lambda v: f"{v} ({facetas[col][v]})"
+
+    # Sidebar para filtros
+    with st.sidebar:
+        st.header("Filtros")
+
+        marca_selecionada = st.multiselect(
+            "Selecione uma ou mais marcas:",
+            options=opcoes_facetadas('Marca'),
+            format_func=rotulo('Marca'),
+            key="filtro_marca"
+        )
+
+        modelo_selecionado = st.multiselect(
+            "Selecione um ou mais modelos:",
+            options=opcoes_facetadas('Modelo'),
+            format_func=rotulo('Modelo'),
+            key="filtro_modelo"
+        )
+
+        estado_selecionado = st.multiselect(
+            "Selecione um ou mais estados:",
+            options=opcoes_facetadas('Estado'),
+            format_func=rotulo('Estado'),
+            key="filtro_estado"
+        )
+
+        lead_selecionado = st.multiselect(
+            "Selecione um ou mais canais de lead:",
+            options=opcoes_facetadas('Origem_lead'),
+            format_func=rotulo('Origem_lead'),
+            key="filtro_lead"
+        )
+
+    # Resumo dos filtros aplicados
+    st.write("**Filtros aplicados:**")
+    st.write(f"**Marcas**: {', '.join(marca_selecionada) if marca_selecionada else 'Todas'} | "
+             f"**Modelos**: {', '.join(modelo_selecionado) if modelo_selecionado else 'Todos'}")
+    st.write(f"**Estados**: {', '.join(estado_selecionado) if estado_selecionado else 'Todos'} | "
+             f"**Leads**: {', '.join(lead_selecionado) if lead_selecionado else 'Todos'}")
+    st.write(f"**Total de veículos vendidos:** {total_vendido}")
+
+    # Visualizações Seção de análise por marca (sempre visível)
+    with perf.span("graficos"):
+        st.subheader("Vendas por Marca")
+        st.bar_chart(vendas['Marca'], 
+                    x_label="Unidades Vendidas", 
+                    color="#494C3A", 
+                    horizontal=True)
+
+        # Seção de análise por modelo
+        st.subheader("Vendas por Modelo")
+        st.bar_chart(vendas['Modelo'],
+                        color="#494C3A",
+                        horizontal=True,
+                        use_container_width=True)    
+
+        # Seção de análise por estado
+        st.subheader("Vendas por Estado")
+        st.bar_chart(vendas['Estado'], 
+                    x_label="Unidades Vendidas", 
+                    color="#494C3A", 
+                    horizontal=True)
+
+        # Seção de análise por Canal
+        st.subheader("Vendas por Lead")
+        st.bar_chart(vendas['Origem_lead'], 
+                    x_label="Unidades Vendidas", 
+                    color="#494C3A", 
+                    horizontal=True)
+
+
+    # Rodapé
+    st.markdown("---")
+    st.markdown("Python Cars 🐍 - Dados fictícios gerados para fins didáticos")
@@ -1,78 +1,100 @@
 import streamlit as st
-import pandas as pd
-import altair as alt
+
+from python_ag.instrumentation import instrument_page
+from python_ag.page_data import PARTS_CUBE, load_parts_cube, refresh_warning
+from python_ag.result_cache import shared_cache
 
 # Configuração
 st.set_page_config(page_title="Python Parts 🐍", layout="wide")
-st.title('📦 Resumo - Vendas de Acessórios')
+with instrument_page("Python Parts") as perf:
+    st.title('📦 Resumo - Vendas de Acessórios')
+
+    # Cubo mês × região × canal × produto do processo, atualizado em segundo
+    # plano (ver page_data). Só a primeira carga pode falhar aqui
+    with perf.span("carga"):
+        try:
+            cubo = load_parts_cube()
+        except Exception as e:
+            st.error(f"Erro ao carregar dados: {str(e)}")
+            st.stop()
+    perf.track("cubo_vendas", cubo)
+    refresh_warning(PARTS_CUBE)
+    meses = cubo.values("mes")
+
+    # Sidebar
+    st.sidebar.title("Filtros")
+    periodo = st.sidebar.selectbox(
+        "Período", 
+        options=["Todo o período", "Último mês", "Últimos 3 meses", "Últimos 6 meses", "Último ano"]
+    )
 
-@st.cache_data
-def load_data():
-    url = "https://raw.githubusercontent.com/fabiobaroliveira/python_automotive_group/main/pages/vendas_acessorios_fake.csv"
-    df = pd.read_csv(url, parse_dates=["data_venda"])
-    df["receita"] = df["quantidade"] * df["preco_unitario"]
-    df["lucro"] = df["receita"] - (df["quantidade"] * df["custo_unitario"])
-    df["mes"] = df["data_venda"].dt.to_period("M").astype(str)
-    return df.sort_values("data_venda")
+    mes_options = {
+        "Todo o período": meses,
+        "Último mês": [meses.max()],
+        "Últimos 3 meses": meses[-3:],
+        "Últimos 6 meses": meses[-6:],
+        "Último ano": meses[-12:]
+    }
+    mes = mes_options[periodo]
 
-df = load_data()
+    regiao = st.sidebar.multiselect(
+        "Região", 
+        options=cubo.values("regiao"), 
+        default=cubo.values("regiao")
+    )
+    canal = st.sidebar.multiselect(
+        "Canal de Venda", 
+        options=cubo.values("canal_venda"), 
+        default=cubo.values("canal_venda")
+    )
 
-# Sidebar
-st.sidebar.title("Filtros")
-periodo = st.sidebar.selectbox(
-    "Período", 
-    options=["Todo o período", "Último mês", "Últimos 3 meses", "Últimos 6 meses", "Último ano"]
-)
+    # Filtros
+    filtros = {"regiao": regiao, "canal_venda": canal, "mes": mes}
 
-mes_options = {
-    "Todo o período": df["mes"].unique(),
-    "Último mês": [df["mes"].max()],
-    "Últimos 3 meses": df["mes"].unique()[-3:],
-    "Últimos 6 meses": df["mes"].unique()[-6:],
-    "Último ano": df["mes"].unique()[-12:]
-}
-mes = mes_options[periodo]
+    # Todas as agregações da página de uma vez, guardadas no cache do processo
+    # por versão dos dados e filtros (combinações repetidas não recalculam)
+    def agregar():
+        return {
+            "totais": cubo.totals(filtros),
+            "receita_mes": cubo.group_sum("mes", "receita", filtros),
+            "top_produtos": cubo.group_sum("produto_nome", "receita", filtros).nlargest(5),
+        }
 
-regiao = st.sidebar.multiselect(
-    "Região", 
-    options=df["regiao"].unique(), 
-    default=df["regiao"].unique()
-)
-canal = st.sidebar.multiselect(
-    "Canal de Venda", 
-    options=df["canal_venda"].unique(), 
-    default=df["canal_venda"].unique()
-)
+    with perf.span("agregacao"):
+        resultado = shared_cache().get_or_compute("vendas_acessorios_fake", cubo.version, filtros, agregar)
+    totais = resultado["totais"]
 
-# Filtros
-df_filtrado = df[df["regiao"].isin(regiao) & df["canal_venda"].isin(canal) & df["mes"].isin(mes)]
+    # Métricas
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Receita Total", f"R$ {totais['receita']:,.2f}")
+    with col2:
+        st.metric("Lucro Bruto", f"R$ {totais['lucro']:,.2f}")
+    with col3:
+        st.metric("Quantidade Vendida", int(totais["quantidade"]))
 
-# Métricas
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("Receita Total", f"R$ {df_filtrado['receita'].sum():,.2f}")
-with col2:
-    st.metric("Lucro Bruto", f"R$ {df_filtrado['lucro'].sum():,.2f}")
-with col3:
-    st.metric("Quantidade Vendida", int(df_filtrado["quantidade"].sum()))
+    # Gráficos (altair só é importado aqui, depois que as métricas já foram enviadas)
+    with perf.span("graficos"):
+        import altair as alt
 
-# Gráficos
-st.subheader("📈 Receita por Mês")
-receita_mes = df_filtrado.groupby("mes")["receita"].sum().reset_index()
-st.altair_chart(
-    alt.Chart(receita_mes).mark_line().encode(
-        x="mes:T",
-        y="receita:Q"
-    ), use_container_width=True
-)
+    st.subheader("📈 Receita por Mês")
+    receita_mes = resultado["receita_mes"].reset_index()
+    with perf.span("graficos"):
+        st.altair_chart(
+            alt.Chart(receita_mes).mark_line().encode(
+                x="mes:T",
+                y="receita:Q"
+            ), use_container_width=True
+        )
 
-st.subheader("🏆 Top Produtos")
-top_produtos = df_filtrado.groupby("produto_nome")["receita"].sum().nlargest(5)
-st.dataframe(
-    top_produtos.reset_index().style.format({"receita": "R$ {:.2f}"}),
-    hide_index=True
-)
+    st.subheader("🏆 Top Produtos")
+    top_produtos = resultado["top_produtos"]
+    with perf.span("graficos"):
+        st.dataframe(
+            top_produtos.reset_index().style.format({"receita": "R$ {:.2f}"}),
+            hide_index=True
+        )
 
-# Rodapé
-st.markdown("---")
-st.markdown("Python Parts 🐍 - Dados fictícios para fins didáticos")
\ No newline at end of file
+    # Rodapé
+    st.markdown("---")
+    st.markdown("Python Parts 🐍 - Dados fictícios para fins didáticos")
@@ -1,260 +1,140 @@
-import streamlit as st
 import pandas as pd
-import random
-from faker import Faker
-import plotly.graph_objects as go
-from datetime import date , timedelta , datetime
+import streamlit as st
+from datetime import date
+
+from python_ag.instrumentation import instrument_page
+from python_ag.page_data import (RENT_A_CAR, load_fleet_kpis, load_marketing_kpis, load_rent_data,
+                                 load_rent_occupancy)
+
 st.set_page_config(page_title="Python Rent a Car 🐍", layout="wide")
+with instrument_page("Python Rent a Car") as perf:
+    st.title("Python Rent a Car (em desenvolvimento)")
+    st.markdown("---")
+
+
+    # Criando Dados
+
+    # Parâmetros (os mesmos da pré-carga, ver page_data)
+    seed = RENT_A_CAR["seed"]
+    num_clientes = RENT_A_CAR["num_clientes"]
+    num_veiculos = RENT_A_CAR["num_veiculos"]
+    num_locacoes = RENT_A_CAR["num_locacoes"]
 
-st.title("Python Rent a Car (em desenvolvimento)")
-st.markdown("---")
-
-
-# Criando Dados
-fake = Faker('pt_BR')
-
-# Parâmetros
-num_clientes = 100
-num_veiculos = 50
-num_lojas = 5
-num_locacoes = 555
-
-# Gerar Clientes
-clientes = []
-for i in range(num_clientes):
-    clientes.append({
-        'id_cliente': i + 1,
-        'nome': fake.name(),
-        'cpf': fake.unique.cpf(),
-        'email': fake.email(),
-        'telefone': fake.phone_number(),
-        'nps': random.choices([10, 9, 8, 7, 6, 5, 4], weights=[0.3, 0.3, 0.2, 0.05, 0.05, 0.05, 0.05])[0]
-    })
-clientes_df = pd.DataFrame(clientes)
-
-# Gerar Veículos
-
-# Categorias e faixas de preço por dia
-categorias = {
-    'Econômico': (98, 157),
-    'Intermediário': (180, 247),
-    'SUV': (299, 433)
-}
-
-# Marcas, modelos e categorias
-marcas_modelos_categorias = [
-    ('Fiat', 'Argo', 'Econômico'),
-    ('Chevrolet', 'Onix', 'Econômico'),
-    ('Volkswagen', 'Gol', 'Econômico'),
-    ('Hyundai', 'HB20', 'Intermediário'),
-    ('Ford', 'Ka', 'Econômico'),
-    ('Toyota', 'Corolla', 'Intermediário'),
-    ('Jeep', 'Renegade', 'SUV'),
-    ('Honda', 'HR-V', 'SUV')
-]
-
-veiculos = []
-for i in range(num_veiculos):
-    marca, modelo, categoria = random.choice(marcas_modelos_categorias)
-    ano = random.randint(2018, 2023)
-    veiculos.append({
-        'id_veiculo': i + 1,
-        'marca': marca,
-        'modelo': modelo,
-        'categoria': categoria,
-        'ano': ano,
-        'placa': fake.unique.license_plate(),
-        'status': 'disponível',
-        'km_total': random.randint(20000, 150000),
-        'tempo_manutencao_dias': random.randint(0, 20)
-    })
-veiculos_df = pd.DataFrame(veiculos)
-
-# Gerar Lojas
-cidades_estados = { "São Paulo": "SP",
-                  "Rio de Janeiro": "RJ",
-                  "Belo Horizonte": "MG",
-                  "Porto Alegre": "RS",
-                  "Curitiba": "PR"}
-
-lojas = []
-for i, (cidade, estado) in enumerate(cidades_estados.items(), start=1):
-    lojas.append({
-        "id_loja": i,
-        "nome_loja": f"Locadora {cidade}",
-        "cidade": cidade,
-        "estado": estado
-    })
-
-lojas_df = pd.DataFrame(lojas)
-
-# Gerar Locações 
-locacoes = []
-historico_veiculos = {v: [] for v in veiculos_df['id_veiculo'].tolist()}
-tentativas = 0
-while len(locacoes) < num_locacoes and tentativas < num_locacoes * 10:
-    tentativas += 1
-    id_cliente = random.choice(clientes_df['id_cliente'].tolist())
-    id_veiculo = random.choice(veiculos_df['id_veiculo'].tolist())
-    id_loja = random.choice(lojas_df['id_loja'].tolist())
-    data_inicio = fake.date_between(start_date='-2y', end_date='today')
-    duracao = random.randint(1, 15)
-    data_fim = data_inicio + timedelta(days=duracao)
-    if random.random() < 0.2:
-        data_fim = None  # locação ativa
-
-    conflito = False
-    for loc in historico_veiculos[id_veiculo]:
-        inicio = loc['data_inicio']
-        fim = loc['data_fim'] if loc['data_fim'] else datetime.today().date()
-        if data_fim:
-            if not (data_fim <= inicio or data_inicio >= fim):
-                conflito = True
-                break
-        else:
-            if data_inicio <= fim:
-                conflito = True
-                break
-
-    if not conflito:
-        categoria = veiculos_df.loc[veiculos_df['id_veiculo'] == id_veiculo, 'categoria'].values[0]
-        preco_min, preco_max = categorias[categoria]
-        preco_dia = random.randint(preco_min, preco_max)
-        receita = preco_dia * duracao if data_fim else 0
-        custo = receita * random.uniform(0.4, 0.7)
-        km_rodado = random.randint(100, 1000)
-        reclamacao = random.choices([0, 1], weights=[0.9, 0.1])[0]
-        sinistro = random.choices([0, 1], weights=[0.95, 0.05])[0]
-
-        nova_loc = {
-            'id_locacao': len(locacoes) + 1,
-            'id_cliente': id_cliente,
-            'id_veiculo': id_veiculo,
-            'id_loja': id_loja,
-            'data_inicio': data_inicio,
-            'data_fim': data_fim,
-            'receita': receita,
-            'custo': custo,
-            'km_rodado': km_rodado,
-            'reclamacao': reclamacao,
-            'sinistro': sinistro,
-            'preco_dia': preco_dia
-        }
-        locacoes.append(nova_loc)
-        historico_veiculos[id_veiculo].append(nova_loc)
-
-locacoes_df = pd.DataFrame(locacoes)
-
-# Vendas e Marketing
-marketing = []
-
-for mes in pd.date_range(start='2023-01-01', end='2024-12-01', freq='MS'):
-    cotacoes = random.randint(150, 400)
-    alugueis_confirmados = random.randint(int(cotacoes * 0.3), cotacoes)
-    investimento_marketing = random.randint(5000, 15000)
-    novos_clientes = random.randint(20, 80)
-
-    taxa_conversao = alugueis_confirmados / cotacoes
-    cac = investimento_marketing / novos_clientes if novos_clientes else 0
-
-    marketing.append({
-        'mes': mes.strftime('%Y-%m'),
-        'cotacoes': cotacoes,
-        'alugueis_confirmados': alugueis_confirmados,
-        'taxa_conversao': round(taxa_conversao, 2),
-        'investimento_marketing': investimento_marketing,
-        'novos_clientes': novos_clientes,
-        'cac': round(cac, 2)
-    })
-
-marketing_df = pd.DataFrame(marketing)
-
-
-'''
-
-# Painel 
-
-## KPIs Operacionais
-'''
-# Taxa de Ocupação de Frota
-
-# Filtrar apenas veiculos disponiveis 
-veiculos_disponiveis = veiculos_df[veiculos_df['status'] == 'disponível']
-
-# Filtrar apenas veículos em locação ativa
-veiculos_alugados = (
-    locacoes_df[locacoes_df['data_fim'].isna()]
-    ['id_veiculo'].unique()
-)
-# Números de veiculos em locação ativa
-numero_alugados = len(veiculos_alugados)
-
-taxa_ocupacao_frota = (numero_alugados /num_veiculos)*100
-
-st.metric("Taxa de Ocupação da Frota",f"{taxa_ocupacao_frota:.2f}%")
-
-# Média de Dias de Aluguel por Veículo
-
-# Adionando nova coluna para mostrar totais de dias alugados
-locacoes_df['data_inicio'] = pd.to_datetime(locacoes_df['data_inicio'])
-locacoes_df['data_fim'] = pd.to_datetime(locacoes_df['data_fim'])
-
-def calcular_dias_alugados(inicio, fim):
     hoje = date.today()
-    return (hoje - inicio.date()).days
+    with perf.span("carga"):
+        dados = load_rent_data(seed, num_clientes, num_veiculos, num_locacoes, hoje)
+    clientes_df = dados['clientes']
+    veiculos_df = dados['veiculos']
+    lojas_df = dados['lojas']
+    locacoes_df = dados['locacoes']
+    marketing_df = dados['marketing']
+    for nome, df in dados.items():
+        perf.track(nome, df)
+
+
+    '''
+
+    # Painel 
+
+    ## KPIs Operacionais
+    '''
+    # Taxa de Ocupação de Frota
+
+    # Veículos ocupados hoje, consultados no índice de intervalos por veículo
+    # (montado uma vez por geração dos dados, ver page_data)
+    with perf.span("ocupacao"):
+        ocupacao = load_rent_occupancy(seed, num_clientes, num_veiculos, num_locacoes, hoje)
+        veiculos_alugados = ocupacao.busy_vehicles(hoje)
+    # Números de veiculos em locação ativa
+    numero_alugados = len(veiculos_alugados)
+
+    taxa_ocupacao_frota = (numero_alugados /num_veiculos)*100
+
+    st.metric("Taxa de Ocupação da Frota",f"{taxa_ocupacao_frota:.2f}%")
+
+    # Média de Dias de Aluguel por Veículo
+
+    # KPIs calculados de uma vez, com aritmética de datas colunar, e guardados em cache
+    with perf.span("agregacao"):
+        kpis = load_fleet_kpis(seed, num_clientes, num_veiculos, num_locacoes, hoje)
+
+    st.metric("Média de Dias de Aluguel por Veículo",f"{kpis['media_dias_por_veiculo']:.0f}")
+
+
+    '''
+    ### Tempo de Indisponibilidade 
+
+    (Tempo em manutenção ou parado / Tempo total disponível)
 
-locacoes_df['dias_alugados'] = locacoes_df.apply(
-    lambda x: calcular_dias_alugados(x['data_inicio'], x['data_fim']), 
-    axis=1
-)
-# Contar total de dias alugados
-total_dias_alugados = locacoes_df['dias_alugados'].sum()
+    Ajuda a identificar gargalos na manutenção.
 
-media_de_dias_alugados = (total_dias_alugados/num_veiculos)
+    '''
+    st.metric("Tempo de Indisponibilidade", f"{kpis['tempo_indisponibilidade'] * 100:.2f}%")
 
+    '''
+    ## KPIs Financeiros
 
-st.metric("Média de Dias de Aluguel por Veículo",f"{media_de_dias_alugados:.0f}")
+    ### Receita Média Diária (RAD)
 
+    (Receita total de aluguéis / Nº total de dias alugados)
 
-'''
-### Tempo de Indisponibilidade 
+    Mede a rentabilidade por dia de aluguel.
 
-(Tempo em manutenção ou parado / Tempo total disponível)
+    '''
+    st.metric("Receita Média Diária (RAD)", f"R$ {kpis['rad']:,.2f}")
 
-Ajuda a identificar gargalos na manutenção.
+    '''
 
-'''
+    ## KPIs de Gestão de Frota
 
-'''
-## KPIs Financeiros
+    ### Idade Média da Frota
 
-### Receita Média Diária (RAD)
+    (Soma da idade dos veículos / Nº total de veículos)
 
-(Receita total de aluguéis / Nº total de dias alugados)
+    Frota muito antiga pode aumentar custos de manutenção.
 
-Mede a rentabilidade por dia de aluguel.
+    '''
+    st.metric("Idade Média da Frota", f"{kpis['idade_media']:.1f} anos")
 
-'''
+    '''
+    ### Quilometragem Média por Veículo
 
-'''
+    (Quilometragem total / Nº de veículos)
 
-## KPIs de Gestão de Frota
+    Ajuda a planejar a renovação da frota.
 
-### Idade Média da Frota
+    '''
+    st.metric("Quilometragem Média por Veículo", f"{kpis['km_medio']:,.0f} km")
 
-(Soma da idade dos veículos / Nº total de veículos)
+    st.subheader("KPIs por Categoria")
+    with perf.span("agregacao"):
+        kpis_categoria = load_fleet_kpis(seed, num_clientes, num_veiculos, num_locacoes, hoje, por="categoria")
+    st.dataframe(kpis_categoria, use_container_width=True)
 
-Frota muito antiga pode aumentar custos de manutenção.
+    '''
+    ## KPIs de Marketing
 
-### Quilometragem Média por Veículo
+    Janelas móveis de 3, 6 e 12 meses terminando em cada mês:
 
-(Quilometragem total / Nº de veículos)
+    - Conversão: aluguéis confirmados / cotações
+    - CAC: investimento em marketing / novos clientes
+    - Eficiência: aluguéis confirmados por R$ 1.000 investidos
 
-Ajuda a planejar a renovação da frota.
+    '''
+    with perf.span("marketing"):
+        marketing = load_marketing_kpis(seed, num_clientes, num_veiculos, num_locacoes, hoje)
+        ultimas = marketing.latest()
+        conversao = pd.DataFrame({f"{meses} meses": marketing.rolling(meses)["conversao"]
+                                  for meses in marketing.janelas})
 
-'''
+    colunas = st.columns(len(ultimas))
+    for col, (meses, linha) in zip(colunas, ultimas.iterrows()):
+        col.metric(f"Conversão ({meses} meses)", f"{linha['conversao'] * 100:.2f}%")
+        col.metric(f"CAC ({meses} meses)", f"R$ {linha['cac']:,.2f}")
+        col.metric(f"Eficiência ({meses} meses)", f"{linha['eficiencia']:.1f} aluguéis / R$ 1.000")
+    st.line_chart(conversao)
 
 
-# Rodapé
-st.markdown("---")
-st.markdown("Python Rent a Car 🐍 - Dados fictícios gerados para fins didáticos")
+    # Rodapé
+    st.markdown("---")
+    st.markdown("Python Rent a Car 🐍 - Dados fictícios gerados para fins didáticos")
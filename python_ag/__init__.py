@@ -0,0 +1 @@
+"""Código compartilhado entre os dashboards do Python Automotive Group."""
@@ -0,0 +1,384 @@
+"""Benchmark headless das páginas, com dados sintéticos em várias escalas.
+
+    python -m python_ag.benchmark --escalas 10k,1m,10m --saida benchmark.json
+    python -m python_ag.benchmark --escalas 10k --comparar benchmark_anterior.json
+    python -m python_ag.benchmark --inicializacao
+
+Para cada escala, os CSVs de ``pages/`` são reamostrados (linhas sorteadas
+com reposição, IDs renumerados) até o número de linhas pedido e gravados em
+``--dados`` (ver ``python_ag.synthetic``). Cada página roda num subprocesso
+com o ``AppTest`` do Streamlit, com ``PYTHON_AG_DATA_SOURCE``, ``PYTHON_AG_MIRROR_DIR`` e ``PYTHON_AG_DB_PATH``
+apontando para esse diretório, em três cenários:
+
+- ``primeira_execucao``: cache frio (lê a fonte, monta espelhos e índices);
+- ``reexecucao``: mesma tela de novo, com o cache quente;
+- ``interacao``: depois de mudar um filtro ou uma busca da página.
+
+Em cada cenário o tempo total é separado em tempo exclusivo de ``carga``
+(funções que leem ou geram os datasets, montagem de índices e a carga inicial
+do banco da oficina), ``filtros`` (seleção de linhas: índices de filtro e de
+busca, máscaras do cubo, consultas filtradas), ``agregacao`` (contagens,
+somas, KPIs, páginas e totais das listagens), ``render`` (chamadas de
+elementos como ``st.dataframe`` e gráficos) e ``outros`` (o resto do script).
+A Rent a Car gera os próprios dados com o número de locações da escala
+(``PYTHON_AG_RENT_LOCACOES``), nas proporções de ``python_ag.synthetic``.
+
+Uma página que não roda (erro de sintaxe, ou nenhum elemento na tela) sai
+com ``erro`` no resultado, em vez de tempos.
+
+O resultado vai para um JSON com o commit atual, para comparar entre versões.
+
+``--inicializacao`` confere o orçamento de tempo de partida
+(``ORCAMENTO_INICIALIZACAO``): quanto ``streamlit run app.py`` leva para
+responder no health check e quanto leva a primeira execução de cada página
+com os CSVs do repositório. Sai com código 1 se algum item estourar.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from python_ag import data_source
+from python_ag.synthetic import DATASETS, generate, parse_escala
+
+PAGINAS = [
+    "app.py",
+    "pages/1_Python_Cars.py",
+    "pages/2_Python_Parts.py",
+    "pages/3_Python_Car_Repair_Shop.py",
+    "pages/3_Python_Rent_a_Car.py",
+]
+ESCALAS = "10k,1m,10m"
+ELEMENTOS_RENDER = [
+    "dataframe", "table", "metric", "bar_chart", "line_chart", "area_chart",
+    "altair_chart", "plotly_chart", "vega_lite_chart",
+]
+# Categorias de tempo de cada cenário; o que não cai em nenhuma vai para ``outros``
+CATEGORIAS = ("carga", "filtros", "agregacao", "render")
+# Thread em que o AppTest roda o script da página
+THREAD_SCRIPT = "ScriptRunner.scriptThread"
+TIMEOUT = 3600
+# Segundos, com cache frio e os CSVs do repositório
+ORCAMENTO_INICIALIZACAO = {
+    "streamlit run app.py": 3.0,
+    "app.py": 1.0,
+    "pages/1_Python_Cars.py": 2.0,
+    "pages/2_Python_Parts.py": 2.0,
+    "pages/3_Python_Car_Repair_Shop.py": 2.0,
+    "pages/3_Python_Rent_a_Car.py": 1.5,
+}
+
+
+# Dados sintéticos
+
+def prepare_data(linhas, destino):
+    """Gera (uma vez) os CSVs sintéticos de uma escala."""
+    destino = Path(destino)
+    marcador = destino / "pronto.json"
+    if marcador.exists():
+        return destino
+    destino.mkdir(parents=True, exist_ok=True)
+    generate(list(DATASETS), linhas, destino, formatos=("csv",))
+    marcador.write_text(json.dumps({"linhas": linhas}))
+    return destino
+
+
+# Medição (roda dentro do subprocesso de cada página)
+
+class Cronometro:
+    """Tempo exclusivo por categoria: cada trecho conta só para a função medida mais interna.
+
+    Uma agregação chamada de dentro de um ``st.dataframe`` conta como
+    ``agregacao``, e o resto do ``st.dataframe`` como ``render``. Só conta a
+    thread que roda o script (a pré-carga em segundo plano do ``app.py``
+    fica de fora, já que não é tempo de tela).
+    """
+    def __init__(self):
+        self.tempos = dict.fromkeys(CATEGORIAS, 0.0)
+        self._local = threading.local()
+
+    def envolver(self, funcao, categoria):
+        """Versão de ``funcao`` que soma seu tempo (sem as chamadas medidas internas) em ``categoria``."""
+        def medida(*args, **kwargs):
+            if threading.current_thread().name != THREAD_SCRIPT:
+                return funcao(*args, **kwargs)
+            pilha = self._local.__dict__.setdefault("pilha", [])
+            agora = time.perf_counter()
+            if pilha:
+                self.tempos[pilha[-1][0]] += agora - pilha[-1][1]
+            pilha.append([categoria, agora])
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                agora = time.perf_counter()
+                self.tempos[categoria] += agora - pilha.pop()[1]
+                if pilha:
+                    pilha[-1][1] = agora
+        medida.__wrapped__ = funcao
+        return medida
+
+    @contextmanager
+    def cenario(self, resultado, nome):
+        self.tempos = dict.fromkeys(CATEGORIAS, 0.0)
+        inicio = time.perf_counter()
+        yield
+        total = time.perf_counter() - inicio
+        resultado[nome] = {
+            "total": total,
+            **self.tempos,
+            "outros": max(total - sum(self.tempos.values()), 0.0),
+        }
+
+
+def _instrumentar(cronometro):
+    import streamlit as st
+    from streamlit.delta_generator import DeltaGenerator
+
+    from python_ag import fleet_kpis, rent_a_car, repair_shop
+    from python_ag.filter_index import FilterIndex
+    from python_ag.marketing_kpis import MarketingKPIs
+    from python_ag.repair_shop import RepairShopDB
+    from python_ag.sales_cube import SalesCube
+    from python_ag.search_index import NgramIndex, PrefixIndex
+
+    for nome in ELEMENTOS_RENDER:
+        setattr(DeltaGenerator, nome, cronometro.envolver(getattr(DeltaGenerator, nome), "render"))
+        # st.dataframe & cia. são métodos já ligados ao DeltaGenerator principal
+        setattr(st, nome, getattr(st._main, nome))
+    data_source.load_dataset = cronometro.envolver(data_source.load_dataset, "carga")
+    rent_a_car.generate_data = cronometro.envolver(rent_a_car.generate_data, "carga")
+    SalesCube.from_dataset = classmethod(cronometro.envolver(SalesCube.from_dataset.__func__, "carga"))
+    repair_shop.load_seed_data = cronometro.envolver(repair_shop.load_seed_data, "carga")
+    fleet_kpis.fleet_kpis = cronometro.envolver(fleet_kpis.fleet_kpis, "agregacao")
+    MarketingKPIs.from_frame = classmethod(cronometro.envolver(MarketingKPIs.from_frame.__func__, "agregacao"))
+    metodos = {
+        FilterIndex: {"__init__": "carga", "rows": "filtros", "counts": "agregacao", "facets": "agregacao"},
+        SalesCube: {"_mascara": "filtros", "totals": "agregacao", "group_sum": "agregacao"},
+        NgramIndex: {"search": "filtros"},
+        PrefixIndex: {"search": "filtros"},
+        MarketingKPIs: {"append": "agregacao", "rolling": "agregacao", "latest": "agregacao"},
+        RepairShopDB: {
+            "seed": "carga", "listagem_clientes": "filtros", "listagem_veiculos": "filtros",
+            "listagem_servicos": "filtros", "agenda": "filtros", "pagina": "agregacao", "total": "agregacao",
+            "resumo_financeiro": "agregacao", "contagem": "agregacao",
+        },
+    }
+    for classe, categorias in metodos.items():
+        for nome, categoria in categorias.items():
+            setattr(classe, nome, cronometro.envolver(getattr(classe, nome), categoria))
+
+
+def _interagir(pagina, at):
+    """Muda um filtro ou uma busca da página; False se a página não tem interação."""
+    if pagina.endswith("1_Python_Cars.py"):
+        filtro = at.multiselect(key="filtro_marca")
+        filtro.set_value(list(filtro.options[:1]))
+    elif pagina.endswith("2_Python_Parts.py"):
+        at.sidebar.selectbox[0].set_value("Último mês")
+        regiao = at.sidebar.multiselect[0]
+        regiao.set_value(list(regiao.options[:1]))
+    elif pagina.endswith("3_Python_Car_Repair_Shop.py"):
+        at.text_input(key="filtro_cliente_tab1").input("ana")
+    else:
+        return False
+    return True
+
+
+def run_page(pagina):
+    """Roda os cenários de uma página no processo atual e devolve os tempos."""
+    from streamlit.testing.v1 import AppTest
+
+    # O AppTest não acusa erro de sintaxe em ``at.exception``: a página só não roda
+    caminho = data_source.REPO_DIR / pagina
+    try:
+        compile(caminho.read_text(encoding="utf-8"), str(caminho), "exec")
+    except SyntaxError as e:
+        return {"erro": f"SyntaxError: {e}"}
+
+    cronometro = Cronometro()
+    _instrumentar(cronometro)
+    resultado = {}
+    at = AppTest.from_file(str(caminho), default_timeout=TIMEOUT)
+    with cronometro.cenario(resultado, "primeira_execucao"):
+        at.run()
+    if not at.main.children and not at.exception:
+        return {"erro": "a página não executou: nenhum elemento na tela"}
+    with cronometro.cenario(resultado, "reexecucao"):
+        at.run()
+    if _interagir(pagina, at):
+        with cronometro.cenario(resultado, "interacao"):
+            at.run()
+    resultado["excecoes"] = [str(e.value) for e in at.exception]
+    resultado["pico_rss_mb"] = data_source.peak_rss_mb()
+    return resultado
+
+
+def _limpar_estado(dados):
+    """Apaga espelhos e banco de uma execução anterior, para a primeira execução ser fria."""
+    shutil.rmtree(Path(dados) / "mirror", ignore_errors=True)
+    for arquivo in Path(dados).glob("repair_shop.sqlite3*"):
+        arquivo.unlink()
+
+
+def _rodar_subprocesso(pagina, dados, fonte=None, locacoes=None):
+    """Roda ``pagina`` num processo novo, depois de apagar o estado deixado pela anterior.
+
+    O aquecimento do ``app.py`` monta espelhos e popula o banco; sem a
+    limpeza, só a primeira página medida teria uma primeira execução fria.
+    """
+    _limpar_estado(dados)
+    env = {
+        **os.environ,
+        **({"PYTHON_AG_RENT_LOCACOES": str(locacoes)} if locacoes else {}),
+        "PYTHON_AG_DATA_SOURCE": str(fonte or dados),
+        "PYTHON_AG_MIRROR_DIR": str(Path(dados) / "mirror"),
+        "PYTHON_AG_DB_PATH": str(Path(dados) / "repair_shop.sqlite3"),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(data_source.REPO_DIR), os.environ.get("PYTHONPATH")])),
+    }
+    saida = subprocess.run(
+        [sys.executable, "-m", "python_ag.benchmark", "--pagina", pagina],
+        env=env, cwd=data_source.REPO_DIR, capture_output=True, text=True,
+    )
+    if saida.returncode:
+        return {"erro": saida.stderr.strip().splitlines()[-1:] or ["sem saída"]}
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=data_source.REPO_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(escalas, dados, paginas=PAGINAS):
+    resultado = {
+        "commit": _commit(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "escalas": {},
+    }
+    for escala in escalas:
+        linhas = parse_escala(escala)
+        destino = prepare_data(linhas, Path(dados) / escala)
+        resultado["escalas"][escala] = {
+            "linhas": linhas,
+            "paginas": {pagina: _rodar_subprocesso(pagina, destino, locacoes=linhas) for pagina in paginas},
+        }
+    return resultado
+
+
+def measure_server_start(timeout=60):
+    """Segundos entre ``streamlit run app.py`` e a primeira resposta do health check."""
+    import socket
+
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        porta = s.getsockname()[1]
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py", "--server.headless=true", f"--server.port={porta}"],
+        cwd=data_source.REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - inicio < timeout:
+            try:
+                with urllib.request.urlopen(f"http://localhost:{porta}/_stcore/health", timeout=1) as resposta:
+                    if resposta.status == 200:
+                        return time.perf_counter() - inicio
+            except OSError:
+                time.sleep(0.05)
+        raise TimeoutError(f"streamlit run app.py não respondeu em {timeout}s")
+    finally:
+        processo.terminate()
+        processo.wait()
+
+
+def check_startup(orcamento=ORCAMENTO_INICIALIZACAO):
+    """Tempos de partida comparados ao orçamento."""
+    tempos = {"streamlit run app.py": measure_server_start()}
+    fonte = data_source.REPO_DIR / "pages"
+    for pagina in PAGINAS:
+        # Um diretório por página: o aquecimento do app.py de uma página não esquenta a seguinte
+        with tempfile.TemporaryDirectory() as dados:
+            resultado = _rodar_subprocesso(pagina, dados, fonte)
+            tempos[pagina] = resultado["primeira_execucao"]["total"] if "erro" not in resultado else float("inf")
+    return {
+        item: {"segundos": segundos, "orcamento": orcamento.get(item), "ok": segundos <= orcamento.get(item, float("inf"))}
+        for item, segundos in tempos.items()
+    }
+
+
+def compare(atual, anterior):
+    """Tabela com a razão atual/anterior do tempo total de cada cenário."""
+    linhas = []
+    for escala, dados in atual["escalas"].items():
+        for pagina, cenarios in dados["paginas"].items():
+            antes = anterior.get("escalas", {}).get(escala, {}).get("paginas", {}).get(pagina, {})
+            for cenario, tempos in cenarios.items():
+                if isinstance(tempos, dict) and isinstance(antes.get(cenario), dict):
+                    linhas.append({
+                        "escala": escala, "pagina": pagina, "cenario": cenario,
+                        "anterior_s": antes[cenario]["total"], "atual_s": tempos["total"],
+                        "razao": tempos["total"] / max(antes[cenario]["total"], 1e-9),
+                    })
+    return pd.DataFrame(linhas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless das páginas do Python AG.")
+    parser.add_argument("--escalas", default=ESCALAS, help="escalas separadas por vírgula (ex.: 10k,1m,10m)")
+    parser.add_argument("--paginas", nargs="*", default=PAGINAS)
+    parser.add_argument("--dados", default=str(data_source.REPO_DIR / ".cache" / "benchmark"),
+                        help="onde gravar (e reaproveitar) os CSVs sintéticos")
+    parser.add_argument("--saida", default="benchmark.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--inicializacao", action="store_true",
+                        help="confere o orçamento de tempo de partida e sai")
+    parser.add_argument("--pagina", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.pagina:
+        # Modo subprocesso: uma página, resultado em JSON na última linha
+        print(json.dumps(run_page(args.pagina)))
+        return 0
+
+    if args.inicializacao:
+        resultado = check_startup()
+        for item, tempo in resultado.items():
+            marca = "ok" if tempo["ok"] else "ESTOUROU"
+            print(f"{item}: {tempo['segundos']:.2f}s (orçamento: {tempo['orcamento']}s) {marca}")
+        return 0 if all(tempo["ok"] for tempo in resultado.values()) else 1
+
+    # Lido antes, caso --comparar e --saida sejam o mesmo arquivo
+    anterior = json.loads(Path(args.comparar).read_text()) if args.comparar else None
+    resultado = run_benchmark(args.escalas.split(","), args.dados, args.paginas)
+    Path(args.saida).write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+    for escala, dados in resultado["escalas"].items():
+        for pagina, cenarios in dados["paginas"].items():
+            resumo = ", ".join(
+                f"{nome} {tempos['total']:.2f}s" for nome, tempos in cenarios.items() if isinstance(tempos, dict)
+            )
+            print(f"[{escala}] {pagina}: {resumo or cenarios}")
+    if anterior is not None:
+        print(compare(resultado, anterior).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
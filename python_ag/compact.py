@@ -0,0 +1,132 @@
+"""Tipos compactos para os DataFrames que ficam em cache.
+
+Os dashboards guardam os DataFrames por processo (``st.cache_data``) e cada
+sessão recebe uma cópia, então o tipo de cada coluna pesa várias vezes:
+
+- colunas de texto repetitivo (marca, estado, status...) viram ``category``:
+  um código inteiro por linha e cada texto guardado uma vez só;
+- inteiros são rebaixados para o menor tipo que comporta os valores;
+- datas seguem como ``datetime64`` nativo (nunca objetos ``date`` do Python).
+
+Floats ficam em float64: são valores monetários, e float32 perderia centavos.
+Texto quase único por linha (nome, CPF, e-mail, telefone) não tem o que
+compactar: nas vendas de seminovos essas colunas são mais da metade da tabela
+compactada, e a redução da tabela inteira fica em cerca de 2x, contra 3,5x a
+4x nas tabelas de vendas de acessórios e de agendamentos.
+
+Blocos lidos em separado (``data_source.iter_mirror``) têm cada um as
+próprias categorias; ``concat`` junta blocos sem perder o ``category``.
+
+``python -m python_ag.compact`` compara a memória dos datasets antes e depois.
+"""
+import argparse
+import sys
+
+import pandas as pd
+import pyarrow as pa
+from pandas.api.types import union_categoricals
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def _ordenar_categorias(serie):
+    """Categorias em ordem alfabética, como as do ``astype("category")``."""
+    categorias = serie.cat.categories
+    if categorias.is_monotonic_increasing:
+        return serie
+    return serie.cat.reorder_categories(categorias.sort_values())
+
+
+def compact(df, categories=()):
+    """``df`` com categorias nas colunas ``categories`` e inteiros rebaixados."""
+    df = df.copy(deep=False)
+    for col in df.columns:
+        serie = df[col]
+        if col in categories:
+            df[col] = _ordenar_categorias(serie.astype("category"))
+        elif pd.api.types.is_integer_dtype(serie.dtype):
+            df[col] = pd.to_numeric(serie, downcast="integer")
+    return df
+
+
+def compact_table(table, categories=()):
+    """Converte uma tabela Arrow em DataFrame compacto.
+
+    As categorias são codificadas ainda no Arrow, sem criar um objeto de
+    texto por linha no caminho.
+    """
+    for col in categories:
+        if col in table.column_names and not pa.types.is_dictionary(table.schema.field(col).type):
+            i = table.column_names.index(col)
+            table = table.set_column(i, col, table.column(col).dictionary_encode())
+    return compact(table.to_pandas(), categories)
+
+
+def concat(frames):
+    """``pd.concat`` que mantém ``category`` quando cada bloco tem categorias diferentes.
+
+    No ``pd.concat``, categorias diferentes viram texto; aqui as colunas
+    categóricas são unidas com ``union_categoricals`` (categorias em ordem
+    alfabética, como em ``compact``).
+    """
+    frames = list(frames)
+    colunas = frames[0].columns
+    categoricas = [col for col in colunas
+                   if all(isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames)]
+    juntos = pd.concat([df.drop(columns=categoricas) for df in frames], ignore_index=True)
+    for col in categoricas:
+        juntos[col] = union_categoricals([df[col] for df in frames], sort_categories=True)
+    return juntos[colunas]
+
+
+def memory_report(frames):
+    """Memória (MB) antes e depois da compactação.
+
+    ``frames`` mapeia nome -> ``(original, compacto)``.
+    """
+    linhas = []
+    for nome, (original, compacto) in frames.items():
+        antes, depois = memory_mb(original), memory_mb(compacto)
+        linhas.append({"dataset": nome, "linhas": len(original), "antes_mb": antes,
+                       "depois_mb": depois, "reducao": antes / depois if depois else float("nan")})
+    relatorio = pd.DataFrame(linhas).set_index("dataset")
+    total = relatorio[["antes_mb", "depois_mb"]].sum()
+    relatorio.loc["total"] = [relatorio["linhas"].sum(), total["antes_mb"], total["depois_mb"],
+                              total["antes_mb"] / total["depois_mb"]]
+    relatorio["linhas"] = relatorio["linhas"].astype("int64")
+    return relatorio
+
+
+def main(argv=None):
+    from python_ag import data_source
+    from python_ag.rent_a_car import COLUNAS_CATEGORICAS, generate_data
+
+    parser = argparse.ArgumentParser(
+        prog="python -m python_ag.compact",
+        description="Memória dos datasets com e sem os tipos compactos.",
+    )
+    parser.add_argument("datasets", nargs="*", help="padrão: todos os do espelho e os da locadora")
+    parser.add_argument("--fonte", default=None, help="diretório ou URL dos CSVs")
+    args = parser.parse_args(argv)
+
+    frames = {}
+    for nome in args.datasets or data_source.DATASETS:
+        if nome in data_source.DATASETS:
+            frames[nome] = (data_source.load_dataset(nome, source=args.fonte, compact_dtypes=False),
+                            data_source.load_dataset(nome, source=args.fonte))
+    if not args.datasets:
+        for nome, df in generate_data(compact_dtypes=False).items():
+            frames[f"rent_a_car.{nome}"] = (df, compact(df, COLUNAS_CATEGORICAS.get(nome, ())))
+    if not frames:
+        parser.error("nenhum dataset conhecido")
+
+    relatorio = memory_report(frames)
+    with pd.option_context("display.float_format", "{:,.2f}".format, "display.width", 120):
+        print(relatorio.to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
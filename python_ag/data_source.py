@@ -0,0 +1,399 @@
+"""Espelho local (Feather) dos datasets usados pelos dashboards.
+
+Cada dataset tem um schema tipado e uma fonte CSV, que pode ser um arquivo
+local ou uma URL HTTP. Na primeira leitura o CSV é convertido para Feather
+em ``MIRROR_DIR``; nas seguintes o espelho é lido do disco com memory
+mapping, e o CSV só é reprocessado quando o tamanho ou a data de
+modificação da fonte mudam. Se a fonte HTTP estiver fora do ar, o último
+espelho válido continua sendo usado.
+
+Variáveis de ambiente:
+
+- ``PYTHON_AG_DATA_SOURCE``: diretório ou URL base dos CSVs (padrão: a pasta
+  ``pages/`` do repositório).
+- ``PYTHON_AG_MIRROR_DIR``: onde guardar os espelhos (padrão: ``.cache/``).
+- ``PYTHON_AG_MAX_MEMORY_MB``: quanto uma ingestão em blocos pode ocupar além
+  da memória que o processo já usa (padrão: 256).
+
+Na leitura, as colunas em ``categories`` viram ``category`` e os inteiros são
+rebaixados para o menor tipo que os comporta (ver ``python_ag.compact``); o
+espelho em disco continua com o schema original.
+
+A ingestão lê o CSV em blocos dimensionados por essa margem (e não pela
+memória do processo, que num servidor Streamlit já começa alta) e grava
+cada bloco como um record batch do espelho; ``iter_dataset`` percorre o
+espelho do mesmo jeito, para quem quer agregar sem carregar tudo.
+
+``load_datasets`` carrega vários datasets em paralelo numa pool de threads: o
+download, o parser de CSV e a conversão Arrow liberam o GIL na maior parte
+do tempo, então datasets independentes não esperam um pelo outro.
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from python_ag.compact import compact_table
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DATA_SOURCE = os.environ.get("PYTHON_AG_DATA_SOURCE", str(REPO_DIR / "pages"))
+MIRROR_DIR = Path(os.environ.get("PYTHON_AG_MIRROR_DIR", REPO_DIR / ".cache" / "mirror"))
+MAX_MEMORY_MB = int(os.environ.get("PYTHON_AG_MAX_MEMORY_MB", 256))
+HTTP_TIMEOUT = 10
+# Folga sobre o tamanho tipado de um bloco (buffers do parser e cópia para
+# Arrow) e parte fixa do teto reservada aos pools de memória do pandas/Arrow
+CHUNK_OVERHEAD = 4
+CHUNK_RESERVED_MB = 48
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    filename: str
+    sep: str = ","
+    decimal: str = "."
+    # coluna -> dtype do pandas; toda coluna que não é data precisa estar aqui
+    dtypes: dict = field(default_factory=dict)
+    # coluna -> formato strptime das colunas de data
+    dates: dict = field(default_factory=dict)
+    # colunas de texto com poucos valores distintos, carregadas como category
+    categories: tuple = ()
+
+    def version(self):
+        """Hash do schema: mudar o schema invalida o espelho existente."""
+        spec = json.dumps([self.sep, self.decimal, self.dtypes, self.dates], sort_keys=True)
+        return hashlib.sha1(spec.encode()).hexdigest()[:12]
+
+
+DATASETS = {
+    ds.name: ds
+    for ds in [
+        Dataset(
+            "vendas_loja_seminovos", "vendas_loja_seminovos.csv", sep=";", decimal=",",
+            dtypes={
+                "ID": "int64", "Nome Completo": "string", "Idade": "int64", "CPF": "string",
+                "Sexo": "string", "Estado Civil": "string", "E-mail": "string", "Telefone": "string",
+                "Cidade": "string", "Estado": "string", "Marca": "string", "Modelo": "string",
+                "Ano_fabricacao": "int64", "Cor": "string", "Valor_venda": "float64",
+                "Forma_pagamento": "string", "Custo_aquisicao": "float64", "Custo_reparos": "float64",
+                "Lucro": "float64", "Dias_estoque": "int64", "Vendedor": "string",
+                "Origem_lead": "string", "NPS_cliente": "int64", "Status_pagamento": "string",
+            },
+            dates={"Data_venda": "%Y-%m-%d", "Data_entrada_estoque": "%Y-%m-%d"},
+            categories=("Sexo", "Estado Civil", "Cidade", "Estado", "Marca", "Modelo", "Cor",
+                        "Forma_pagamento", "Vendedor", "Origem_lead", "Status_pagamento"),
+        ),
+        Dataset(
+            "vendas_acessorios_fake", "vendas_acessorios_fake.csv",
+            dtypes={
+                "produto_id": "string", "produto_nome": "string", "categoria": "string",
+                "canal_venda": "string", "regiao": "string", "cliente_tipo": "string",
+                "quantidade": "int64", "preco_unitario": "float64", "custo_unitario": "float64",
+                "vendedor_id": "string", "estoque_disponivel": "int64",
+            },
+            dates={"data_venda": "%Y-%m-%d"},
+            categories=("produto_id", "produto_nome", "categoria", "canal_venda", "regiao",
+                        "cliente_tipo", "vendedor_id"),
+        ),
+        Dataset(
+            "clientes", "clientes.csv",
+            dtypes={
+                "id_cliente": "int64", "nome": "string", "cpf": "string", "telefone": "string",
+                "email": "string", "data_nascimento": "string", "sexo": "string", "endereco": "string",
+                "numero": "int64", "bairro": "string", "cep": "string", "cidade": "string",
+                "estado": "string",
+            },
+            categories=("sexo", "cidade", "estado"),
+        ),
+        Dataset(
+            "veiculos", "veiculos.csv",
+            dtypes={
+                "id_veiculo": "int64", "id_cliente": "int64", "marca": "string", "modelo": "string",
+                "ano": "int64", "cor": "string", "placa": "string",
+            },
+            categories=("marca", "modelo", "cor"),
+        ),
+        Dataset(
+            "agendamentos", "agendamentos.csv", sep=";",
+            dtypes={
+                "id_agendamento": "int64", "id_veiculo": "Int64", "horario_agendamento": "string",
+                "tipo_servico": "string", "valor": "float64", "status": "string",
+            },
+            dates={"data_agendamento": "%d/%m/%Y"},
+            categories=("horario_agendamento", "tipo_servico", "status"),
+        ),
+    ]
+}
+
+
+# dtype do pandas -> tipo da coluna no espelho
+ARROW_TYPES = {"int64": pa.int64(), "Int64": pa.int64(), "float64": pa.float64(), "string": pa.large_string()}
+
+
+def arrow_schema(dataset, colunas):
+    """Schema do espelho para ``colunas``, tirado do ``Dataset`` e não inferido.
+
+    Inferir do primeiro bloco quebra no meio do arquivo quando um bloco
+    seguinte traz outro tipo (uma coluna vazia no começo, um texto numa
+    coluna que parecia numérica), então toda coluna precisa estar declarada.
+    """
+    faltando = [col for col in colunas if col not in dataset.dtypes and col not in dataset.dates]
+    if faltando:
+        raise ValueError(f"Colunas sem dtype declarado em {dataset.name}: {', '.join(faltando)}")
+    return pa.schema([
+        (col, pa.timestamp("us") if col in dataset.dates else ARROW_TYPES[dataset.dtypes[col]])
+        for col in colunas
+    ])
+
+
+def _is_url(source):
+    return source.startswith(("http://", "https://"))
+
+
+def source_path(dataset, source=None):
+    """Caminho ou URL do CSV de ``dataset`` dentro de ``source``."""
+    source = source or DATA_SOURCE
+    if _is_url(source):
+        return source.rstrip("/") + "/" + dataset.filename
+    return str(Path(source) / dataset.filename)
+
+
+def source_signature(path):
+    """Tamanho e data de modificação da fonte, sem baixar o conteúdo."""
+    if not _is_url(path):
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+    request = urllib.request.Request(path, method="HEAD")
+    with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+        headers = response.headers
+        # raw.githubusercontent.com não envia Last-Modified, só ETag
+        return {
+            "size": int(headers.get("Content-Length", -1)),
+            "mtime": headers.get("Last-Modified") or headers.get("ETag"),
+        }
+
+
+def _apply_schema(dataset, df):
+    for col, dtype in dataset.dtypes.items():
+        if dtype == "Int64" and col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+    for col, fmt in dataset.dates.items():
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format=fmt, errors="coerce")
+    return df
+
+
+def _read_csv(dataset, path, **kwargs):
+    return pd.read_csv(
+        path,
+        sep=dataset.sep,
+        decimal=dataset.decimal,
+        encoding="utf-8-sig",
+        dtype={col: dtype for col, dtype in dataset.dtypes.items() if dtype != "Int64"},
+        **kwargs,
+    )
+
+
+def read_source(dataset, path):
+    """Lê o CSV da fonte aplicando o schema tipado do dataset."""
+    return _apply_schema(dataset, _read_csv(dataset, path))
+
+
+def read_source_sample(dataset, path, nrows=1_000):
+    return _apply_schema(dataset, _read_csv(dataset, path, nrows=nrows))
+
+
+def resident_mb():
+    """Memória residente atual do processo, em MB (0 onde não há ``/proc``)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+def peak_rss_mb():
+    """Pico da memória residente do processo, em MB.
+
+    No Linux vem de ``VmHWM``: o ``ru_maxrss`` de um processo recém-criado
+    pode herdar o pico do processo pai, que fez o fork.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for linha in status:
+                if linha.startswith("VmHWM:"):
+                    return int(linha.split()[1]) / 2 ** 10
+    except OSError:
+        pass
+    import resource
+
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2 ** 20 if sys.platform == "darwin" else pico / 2 ** 10
+
+
+def chunk_rows(dataset, path, max_memory_mb=None):
+    """Quantas linhas por bloco cabem na margem de memória da ingestão.
+
+    Estima o tamanho de uma linha já tipada a partir de uma amostra e reserva
+    uma folga para os buffers do parser e a conversão para Arrow.
+    """
+    max_memory_mb = max_memory_mb or MAX_MEMORY_MB
+    amostra = read_source_sample(dataset, path)
+    bytes_por_linha = max(amostra.memory_usage(deep=True).sum() / max(len(amostra), 1), 1)
+    orcamento = max(max_memory_mb - CHUNK_RESERVED_MB, 1) * 2 ** 20
+    return max(1_000, int(orcamento / (bytes_por_linha * CHUNK_OVERHEAD)))
+
+
+def read_source_chunks(dataset, path, max_memory_mb=None):
+    """Lê o CSV em blocos tipados, respeitando o teto de memória."""
+    linhas = chunk_rows(dataset, path, max_memory_mb)
+    with _read_csv(dataset, path, chunksize=linhas) as leitor:
+        for bloco in leitor:
+            yield _apply_schema(dataset, bloco)
+
+
+def _mirror_paths(dataset):
+    return MIRROR_DIR / f"{dataset.name}.feather", MIRROR_DIR / f"{dataset.name}.json"
+
+
+def _write_atomic(path, write):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def write_mirror(dataset, blocos, meta):
+    """Grava o espelho Feather (Arrow IPC sem compressão) bloco a bloco.
+
+    ``blocos`` é um iterável de DataFrames; cada um vira um record batch,
+    então o arquivo inteiro nunca precisa estar em memória. O schema vem do
+    ``Dataset`` (ver ``arrow_schema``), igual para todos os blocos.
+    """
+    data_path, meta_path = _mirror_paths(dataset)
+
+    def write(tmp):
+        writer = None
+        try:
+            for bloco in blocos:
+                if writer is None:
+                    schema = arrow_schema(dataset, bloco.columns)
+                    writer = pa.ipc.new_file(tmp, schema)
+                writer.write_table(pa.Table.from_pandas(bloco, schema=schema, preserve_index=False))
+            if writer is None:
+                raise ValueError(f"Fonte de {dataset.name} não tem linhas")
+        finally:
+            if writer is not None:
+                writer.close()
+
+    _write_atomic(data_path, write)
+    _write_atomic(meta_path, lambda tmp: Path(tmp).write_text(json.dumps(meta)))
+
+
+def read_mirror(dataset, columns=None, compact_dtypes=True):
+    data_path, _ = _mirror_paths(dataset)
+    table = feather.read_table(data_path, columns=columns, memory_map=True)
+    return compact_table(table, dataset.categories) if compact_dtypes else table.to_pandas()
+
+
+def iter_mirror(dataset, columns=None, compact_dtypes=True):
+    """Percorre o espelho um record batch por vez.
+
+    Aqui o arquivo é lido sem memory mapping: as páginas mapeadas contariam
+    na memória residente do processo, e a ideia é que só o bloco atual ocupe
+    memória.
+    """
+    data_path, _ = _mirror_paths(dataset)
+    with pa.OSFile(str(data_path)) as origem:
+        leitor = pa.ipc.open_file(origem)
+        for i in range(leitor.num_record_batches):
+            lote = leitor.get_batch(i)
+            if columns is not None:
+                lote = lote.select(columns)
+            if compact_dtypes:
+                yield compact_table(pa.Table.from_batches([lote]), dataset.categories)
+            else:
+                yield lote.to_pandas()
+
+
+def mirror_meta(dataset):
+    _, meta_path = _mirror_paths(dataset)
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def dataset_version(name):
+    """Identificador do conteúdo do espelho (fonte e schema), ou None sem espelho."""
+    meta = mirror_meta(DATASETS[name])
+    if meta is None:
+        return None
+    return hashlib.sha1(json.dumps(meta, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def refresh_mirror(dataset, source=None):
+    """Reprocessa o CSV se a fonte mudou. Retorna True se o espelho foi regravado."""
+    path = source_path(dataset, source)
+    meta = mirror_meta(dataset)
+    try:
+        signature = source_signature(path)
+    except OSError:
+        # Fonte indisponível (ex.: sem rede): segue com o espelho que existir
+        if meta is None:
+            raise
+        return False
+
+    current = {"source": path, "version": dataset.version(), **signature}
+    if meta == current and _mirror_paths(dataset)[0].exists():
+        return False
+    write_mirror(dataset, read_source_chunks(dataset, path), current)
+    return True
+
+
+def load_dataset(name, columns=None, source=None, compact_dtypes=True):
+    """Carrega ``name`` a partir do espelho local, atualizando-o se necessário.
+
+    Com ``compact_dtypes=False`` as colunas vêm com os tipos do schema, sem
+    categorias nem inteiros rebaixados.
+    """
+    dataset = DATASETS[name]
+    refresh_mirror(dataset, source)
+    return read_mirror(dataset, columns, compact_dtypes)
+
+
+def load_datasets(names, source=None, max_workers=None, compact_dtypes=True):
+    """Carrega vários datasets em paralelo. Retorna um dict nome -> DataFrame.
+
+    Se algum falhar, a exceção dele é levantada depois que todos terminarem.
+    """
+    names = list(names)
+    with ThreadPoolExecutor(max_workers=max_workers or len(names) or 1,
+                            thread_name_prefix="load_dataset") as pool:
+        futuros = {
+            nome: pool.submit(load_dataset, nome, source=source, compact_dtypes=compact_dtypes)
+            for nome in names
+        }
+    return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+
+def iter_dataset(name, columns=None, source=None, compact_dtypes=True):
+    """Como ``load_dataset``, mas entrega o dataset em blocos de DataFrame."""
+    dataset = DATASETS[name]
+    refresh_mirror(dataset, source)
+    yield from iter_mirror(dataset, columns, compact_dtypes)
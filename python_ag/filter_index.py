@@ -0,0 +1,145 @@
+"""Índice de filtros por colunas categóricas.
+
+Cada coluna filtrável vira um array de códigos inteiros (``0`` = vazio) e uma
+lista de linhas por valor: as linhas ficam ordenadas por código, e os
+``limites`` dizem onde começa e termina cada valor. Uma seleção é resolvida
+pegando as linhas da coluna mais restritiva e conferindo as demais só nessas
+linhas, sem copiar o DataFrame. As contagens por valor saem com
+``np.bincount`` sobre as linhas selecionadas.
+
+``facets`` calcula a navegação facetada: para cada coluna, quantas linhas cada
+valor teria considerando só os filtros das *outras* colunas.
+"""
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    def __init__(self, df, colunas, version=None):
+        """``version`` identifica os dados de ``df`` (ex.: ``dataset_version``)."""
+        self.n_linhas = len(df)
+        self.version = version
+        self.colunas = list(colunas)
+        self._categorias = {}
+        self._codigos = {}
+        self._linhas = {}
+        self._limites = {}
+        self._contagens = {}
+        for col in self.colunas:
+            codigos, categorias = pd.factorize(df[col], sort=True)
+            # Desloca em 1 para o vazio (-1 no factorize) virar o código 0
+            codigos = (codigos + 1).astype(np.int32)
+            contagens = np.bincount(codigos, minlength=len(categorias) + 1)
+            self._categorias[col] = pd.Index(categorias, name=col)
+            self._codigos[col] = codigos
+            self._linhas[col] = np.argsort(codigos, kind="stable").astype(np.int64)
+            self._limites[col] = np.r_[0, np.cumsum(contagens)]
+            self._contagens[col] = contagens
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos arrays do índice."""
+        return sum(a.nbytes for arrays in (self._codigos, self._linhas, self._limites, self._contagens)
+                   for a in arrays.values())
+
+    def options(self, col):
+        """Valores distintos (ordenados) de ``col``."""
+        return self._categorias[col]
+
+    def _serie(self, col, contagem, so_positivos=True):
+        serie = pd.Series(contagem[1:], index=self._categorias[col])
+        return serie[serie > 0] if so_positivos else serie
+
+    def _codigos_selecionados(self, col, valores):
+        codigos = self._categorias[col].get_indexer(list(valores)) + 1
+        return np.unique(codigos[codigos > 0])
+
+    def _linhas_valores(self, col, codigos):
+        """Linhas (ordenadas) que têm algum dos códigos em ``col``."""
+        limites, linhas = self._limites[col], self._linhas[col]
+        partes = [linhas[limites[c]:limites[c + 1]] for c in codigos]
+        if len(partes) == 1:
+            return partes[0]
+        return np.sort(np.concatenate(partes)) if partes else np.empty(0, dtype=np.int64)
+
+    def rows(self, selecoes):
+        """Posições das linhas que passam em todos os filtros.
+
+        ``selecoes`` mapeia coluna -> valores aceitos; colunas ausentes ou com
+        lista vazia não filtram. Retorna None quando nada é filtrado.
+        """
+        ativos = {col: self._codigos_selecionados(col, valores)
+                  for col, valores in selecoes.items() if len(valores)}
+        if not ativos:
+            return None
+        # Parte da coluna com menos linhas selecionadas
+        tamanho = {col: self._contagens[col][codigos].sum() for col, codigos in ativos.items()}
+        ordem = sorted(ativos, key=tamanho.get)
+        linhas = self._linhas_valores(ordem[0], ativos[ordem[0]])
+        for col in ordem[1:]:
+            aceitos = np.zeros(len(self._categorias[col]) + 1, dtype=bool)
+            aceitos[ativos[col]] = True
+            linhas = linhas[aceitos[self._codigos[col][linhas]]]
+        return linhas
+
+    def counts(self, selecoes):
+        """Total de linhas e contagem por valor de cada coluna após os filtros.
+
+        Retorna ``(total, {coluna: Series})``; as Series só trazem valores com
+        contagem maior que zero, como um ``groupby().size()``.
+        """
+        linhas = self.rows(selecoes)
+        total = self.n_linhas if linhas is None else len(linhas)
+        contagens = {}
+        for col in self.colunas:
+            if linhas is None:
+                contagem = self._contagens[col]
+            else:
+                contagem = np.bincount(self._codigos[col][linhas],
+                                       minlength=len(self._categorias[col]) + 1)
+            contagens[col] = self._serie(col, contagem)
+        return total, contagens
+
+    def facets(self, selecoes):
+        """Contagens filtradas e facetas de todas as colunas numa passada só.
+
+        Uma linha entra na faceta de ``col`` se passa em todos os filtros,
+        ou se falha apenas no filtro da própria ``col``. Por isso basta contar,
+        por linha, em quantos filtros ela falha.
+
+        Retorna ``(total, contagens, facetas)``: ``total`` e ``contagens``
+        como em ``counts``; ``facetas`` mapeia coluna -> Series com a
+        contagem de cada valor possível (zero = opção impossível).
+        """
+        ativos = {col: self._codigos_selecionados(col, valores)
+                  for col, valores in selecoes.items() if len(valores)}
+        if not ativos:
+            total, contagens = self.counts({})
+            facetas = {col: self._serie(col, self._contagens[col], so_positivos=False)
+                       for col in self.colunas}
+            return total, contagens, facetas
+
+        falhas = {}
+        n_falhas = np.zeros(self.n_linhas, dtype=np.int8)
+        for col, codigos in ativos.items():
+            aceitos = np.zeros(len(self._categorias[col]) + 1, dtype=bool)
+            aceitos[codigos] = True
+            falhas[col] = ~aceitos[self._codigos[col]]
+            n_falhas += falhas[col]
+
+        # Só interessam linhas que falham em no máximo um filtro
+        candidatas = np.flatnonzero(n_falhas <= 1)
+        passa_todos = n_falhas[candidatas] == 0
+        linhas = candidatas[passa_todos]
+
+        contagens, facetas = {}, {}
+        for col in self.colunas:
+            n = len(self._categorias[col]) + 1
+            codigos = self._codigos[col]
+            contagem = np.bincount(codigos[linhas], minlength=n)
+            contagens[col] = self._serie(col, contagem)
+            if col in ativos:
+                extras = candidatas[~passa_todos & falhas[col][candidatas]]
+                contagem = contagem + np.bincount(codigos[extras], minlength=n)
+            facetas[col] = self._serie(col, contagem, so_positivos=False)
+        return len(linhas), contagens, facetas
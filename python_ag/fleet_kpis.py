@@ -0,0 +1,134 @@
+"""KPIs de frota da Python Rent a Car, calculados de forma colunar.
+
+Nada aqui percorre linhas: as datas viram inteiros (dias), os grupos viram
+códigos e as somas saem de ``np.bincount``. Os KPIs por veículo (idade,
+quilometragem, manutenção) são agregados sobre os veículos que aparecem nas
+locações de cada grupo, usando uma matriz de presença grupo × veículo.
+
+Agrupamentos aceitos em ``por``: ``"loja"``, ``"categoria"`` e ``"mes"``
+(mês de início da locação).
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+AGRUPAMENTOS = ("loja", "categoria", "mes")
+
+
+def _dias(valores):
+    """Dias desde 1970 de um array datetime64, sem passar por ``astype``."""
+    unidade, _ = np.datetime_data(valores.dtype)
+    por_dia = np.timedelta64(1, "D") // np.timedelta64(1, unidade)
+    return valores.view(np.int64) // por_dia
+
+
+def dias_alugados(locacoes_df, hoje=None):
+    """Dias de cada locação; as em andamento contam até ``hoje``."""
+    hoje = np.datetime64(hoje or date.today(), "D").astype(np.int64)
+    inicio = _dias(locacoes_df["data_inicio"].to_numpy())
+    fim = locacoes_df["data_fim"].to_numpy()
+    fim = np.where(np.isnat(fim), hoje, _dias(fim))
+    return pd.Series(fim - inicio, index=locacoes_df.index, name="dias_alugados")
+
+
+def _posicao_veiculo(locacoes_df, veiculos_df):
+    """Posição em ``veiculos_df`` do veículo de cada locação (-1 se não está na frota)."""
+    ids = veiculos_df["id_veiculo"].to_numpy()
+    if len(ids) and ids[0] == 1 and ids[-1] == len(ids) and (np.diff(ids) == 1).all():
+        # IDs sequenciais (caso do gerador): a posição é o próprio ID - 1
+        posicao = locacoes_df["id_veiculo"].to_numpy() - 1
+        return np.where((posicao >= 0) & (posicao < len(ids)), posicao, -1)
+    return pd.Index(ids).get_indexer(locacoes_df["id_veiculo"])
+
+
+def _grupos(por, locacoes_df, veiculos_df, posicao_veiculo):
+    """Códigos de grupo por locação e os rótulos correspondentes."""
+    if por is None:
+        return np.zeros(len(locacoes_df), dtype=np.int64), pd.Index(["total"])
+    if por == "loja":
+        codigos, rotulos = pd.factorize(locacoes_df["id_loja"], sort=True)
+        return codigos, pd.Index(rotulos, name="id_loja")
+    if por == "categoria":
+        codigos_veiculo, rotulos = pd.factorize(veiculos_df["categoria"], sort=True)
+        return codigos_veiculo[posicao_veiculo], pd.Index(rotulos, name="categoria")
+    if por == "mes":
+        # Converte para mês só os dias distintos e espalha pelos códigos de dia
+        dias = _dias(locacoes_df["data_inicio"].to_numpy())
+        if not len(dias):
+            return dias, pd.PeriodIndex([], freq="M", name="mes")
+        primeiro_dia = dias.min()
+        calendario = np.arange(primeiro_dia, dias.max() + 1).astype("datetime64[D]")
+        meses = calendario.astype("datetime64[M]").astype(np.int64)
+        codigos = (meses - meses[0])[dias - primeiro_dia]
+        rotulos = pd.PeriodIndex(
+            np.arange(meses[0], meses[-1] + 1).astype("datetime64[M]"), freq="M", name="mes"
+        )
+        return codigos, rotulos
+    raise ValueError(f"Agrupamento inválido: {por!r}. Use um de {AGRUPAMENTOS} ou None.")
+
+
+def fleet_kpis(locacoes_df, veiculos_df, por=None, hoje=None):
+    """Calcula os KPIs da frota.
+
+    Retorna uma Series com os KPIs gerais quando ``por`` é None, ou um
+    DataFrame com uma linha por grupo.
+    """
+    hoje = hoje or date.today()
+    posicao_veiculo = _posicao_veiculo(locacoes_df, veiculos_df)
+    if (posicao_veiculo < 0).any():
+        # Locações de veículos fora de ``veiculos_df`` não entram nos KPIs
+        # (com -1, seriam creditadas ao último veículo da frota)
+        na_frota = posicao_veiculo >= 0
+        locacoes_df, posicao_veiculo = locacoes_df[na_frota], posicao_veiculo[na_frota]
+    codigos, rotulos = _grupos(por, locacoes_df, veiculos_df, posicao_veiculo)
+    n_grupos = len(rotulos)
+
+    dias = dias_alugados(locacoes_df, hoje).to_numpy()
+    encerrada = locacoes_df["data_fim"].notna().to_numpy()
+    receita = locacoes_df["receita"].to_numpy(dtype=np.float64)
+
+    def somar(pesos=None):
+        if por is None:
+            return np.array([len(codigos) if pesos is None else pesos.sum()], dtype=np.float64)
+        return np.bincount(codigos, weights=pesos, minlength=n_grupos)
+
+    locacoes = somar()
+    total_dias = somar(dias)
+    total_receita = somar(receita)
+    # Locações em andamento ainda não têm receita, então ficam fora da RAD
+    dias_encerradas = somar(dias * encerrada)
+    receita_encerradas = somar(receita * encerrada)
+
+    # KPIs por veículo: sem agrupamento vale a frota toda, com agrupamento
+    # vale o conjunto de veículos que teve locação no grupo
+    n_veiculos = len(veiculos_df)
+    if por is None:
+        presenca = np.ones((1, n_veiculos), dtype=bool)
+    else:
+        presenca = np.zeros((n_grupos, n_veiculos), dtype=bool)
+        presenca[codigos, posicao_veiculo] = True
+    veiculos = presenca.sum(axis=1)
+
+    primeira_locacao = locacoes_df["data_inicio"].min()
+    periodo_dias = max((pd.Timestamp(hoje) - primeira_locacao).days, 1) if len(locacoes_df) else 1
+    idade = pd.Timestamp(hoje).year - veiculos_df["ano"].to_numpy(dtype=np.float64)
+    km = veiculos_df["km_total"].to_numpy(dtype=np.float64)
+    manutencao = veiculos_df["tempo_manutencao_dias"].to_numpy(dtype=np.float64)
+    peso = presenca.astype(np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resultado = pd.DataFrame({
+            "locacoes": locacoes.astype(np.int64),
+            "veiculos": veiculos,
+            "dias_alugados": total_dias.astype(np.int64),
+            "media_dias_por_veiculo": total_dias / veiculos,
+            "taxa_ocupacao": total_dias / (veiculos * periodo_dias),
+            "receita": total_receita,
+            "rad": receita_encerradas / dias_encerradas,
+            "tempo_indisponibilidade": (peso @ manutencao) / (veiculos * periodo_dias),
+            "idade_media": (peso @ idade) / veiculos,
+            "km_medio": (peso @ km) / veiculos,
+        }, index=rotulos)
+
+    return resultado.iloc[0] if por is None else resultado
@@ -0,0 +1,221 @@
+"""Medição de cada execução (rerun) das páginas, com painel de debug.
+
+Uso numa página::
+
+    with instrument_page("Python Cars") as perf:
+        with perf.span("carga"):
+            ...
+        perf.track("vendas", df)   # memória, calculada só com o painel ligado
+        ...
+
+A medição fecha ao sair do bloco, inclusive quando a execução é interrompida
+por ``st.stop()``, ``st.rerun()`` ou uma exceção: o perfilador é desligado e
+o registro é gravado com o motivo em ``saida``. O painel só é desenhado
+quando a execução chega ao fim do bloco.
+
+Cada execução vira uma linha JSON no logger ``python_ag.perf`` (página, tempo
+total e de cada etapa). Com ``PYTHON_AG_PERF_LOG`` apontando para um arquivo
+(ou ``-`` para stderr), essas linhas são gravadas lá.
+
+O painel aparece na sidebar com ``?debug=1`` na URL ou ``PYTHON_AG_DEBUG=1``:
+mostra as últimas ``HISTORICO`` execuções da sessão, a memória dos DataFrames
+registrados e permite perfilar a próxima execução com cProfile ou
+pyinstrument (se estiver instalado).
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+
+HISTORICO = 20
+LINHAS_PERFIL = 30
+PERFILADORES = ("cProfile", "pyinstrument")
+
+logger = logging.getLogger("python_ag.perf")
+
+
+def _configurar_log():
+    destino = os.environ.get("PYTHON_AG_PERF_LOG")
+    if not destino or logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr) if destino == "-" else logging.FileHandler(destino)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _tamanho(obj):
+    """Bytes ocupados por um DataFrame, Series ou array (None se não souber medir)."""
+    if hasattr(obj, "memory_usage"):
+        uso = obj.memory_usage(deep=True)
+        return int(uso.sum()) if hasattr(uso, "sum") else int(uso)
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    return None
+
+
+class _Perfilador:
+    def __init__(self, tipo):
+        self.tipo = tipo
+        if tipo == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                # Dependência opcional: sem ela, cai no cProfile
+                self.tipo = "cProfile"
+            else:
+                self._perfil = Profiler()
+                self._perfil.start()
+                return
+        self._perfil = cProfile.Profile()
+        self._perfil.enable()
+
+    def stop(self):
+        """Encerra e devolve o relatório em texto."""
+        if self.tipo == "pyinstrument":
+            self._perfil.stop()
+            return self._perfil.output_text(unicode=True)
+        self._perfil.disable()
+        saida = io.StringIO()
+        pstats.Stats(self._perfil, stream=saida).sort_stats("cumulative").print_stats(LINHAS_PERFIL)
+        return saida.getvalue()
+
+
+class Rerun:
+    def __init__(self, pagina, perfilador=None, historico=None):
+        self.pagina = pagina
+        # Execuções anteriores; o registro desta entra aqui ao fechar
+        self.historico = historico if historico is not None else deque(maxlen=HISTORICO)
+        self.inicio = time.time()
+        self.etapas = {}
+        self._t0 = time.perf_counter()
+        self._objetos = {}
+        self._perfilador = _Perfilador(perfilador) if perfilador else None
+        self._registro = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, excecao, tb):
+        if tipo is None:
+            debug_panel(self)
+        else:
+            # st.stop() e st.rerun() chegam aqui como StopException e RerunException;
+            # daí em diante o session_state levanta a mesma exceção de novo, por
+            # isso o histórico já vem guardado no objeto
+            self.historico.append(self.finish(saida=tipo.__name__))
+        return False
+
+    @contextmanager
+    def span(self, nome):
+        """Soma o tempo do bloco na etapa ``nome``."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def track(self, nome, obj):
+        """Registra um DataFrame (ou função que o devolve) para o relatório de memória."""
+        self._objetos[nome] = obj
+
+    def memory(self):
+        memoria = {}
+        for nome, obj in self._objetos.items():
+            tamanho = _tamanho(obj() if callable(obj) else obj)
+            if tamanho is not None:
+                memoria[nome] = tamanho
+        return memoria
+
+    def finish(self, memoria=False, saida="fim"):
+        """Fecha a medição, grava o log JSON e devolve o registro da execução.
+
+        Só a primeira chamada mede; as seguintes devolvem o mesmo registro.
+        """
+        if self._registro is not None:
+            return self._registro
+        total = time.perf_counter() - self._t0
+        registro = self._registro = {
+            "pagina": self.pagina,
+            "inicio": round(self.inicio, 3),
+            "total": total,
+            "etapas": dict(self.etapas),
+            "outros": max(total - sum(self.etapas.values()), 0.0),
+            "saida": saida,
+        }
+        if memoria:
+            registro["memoria"] = self.memory()
+        _configurar_log()
+        logger.info(json.dumps(registro, ensure_ascii=False))
+        if self._perfilador is not None:
+            registro["perfilador"] = self._perfilador.tipo
+            registro["perfil"] = self._perfilador.stop()
+        return registro
+
+
+# Integração com o Streamlit (importado só quando usado)
+
+def debug_enabled():
+    import streamlit as st
+
+    return os.environ.get("PYTHON_AG_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+def instrument_page(pagina):
+    """Começa a medir a execução (use com ``with``); perfila se o painel pediu na execução anterior."""
+    import streamlit as st
+
+    historicos = st.session_state.setdefault("_perf_historico", {})
+    return Rerun(pagina, perfilador=st.session_state.pop("_perf_perfilar", None),
+                 historico=historicos.setdefault(pagina, deque(maxlen=HISTORICO)))
+
+
+def debug_panel(perf):
+    """Fecha a medição e, com o debug ligado, mostra o painel na sidebar."""
+    import pandas as pd
+    import streamlit as st
+
+    ligado = debug_enabled()
+    registro = perf.finish(memoria=ligado)
+    historico = perf.historico
+    if not historico or historico[-1] is not registro:
+        historico.append(registro)
+    if not ligado:
+        return
+
+    with st.sidebar.expander("⏱️ Desempenho", expanded=True):
+        tempos = pd.DataFrame(
+            [{**r["etapas"], "outros": r["outros"], "total": r["total"]} for r in reversed(historico)]
+        ).fillna(0.0) * 1000
+        st.caption(f"Últimas {len(historico)} execuções (ms), da mais recente para a mais antiga")
+        st.dataframe(tempos.round(1), use_container_width=True, hide_index=True)
+
+        if registro.get("memoria"):
+            memoria = pd.Series(registro["memoria"], name="MB") / 2 ** 20
+            st.caption("Memória dos DataFrames (MB)")
+            st.dataframe(memoria.round(2), use_container_width=True)
+
+        from python_ag.result_cache import shared_cache
+
+        cache = shared_cache().stats()
+        st.caption(
+            f"Cache de resultados: {cache['acertos']} acertos, {cache['faltas']} faltas "
+            f"({cache['taxa_acerto']:.0%}), {cache['itens']} itens, "
+            f"{cache['mb']:.1f} de {cache['limite_mb']:.0f} MB, {cache['descartes_lru']} descartes"
+        )
+
+        perfilador = st.selectbox("Perfilar a próxima execução com", PERFILADORES, key="_perf_tipo")
+        if st.button("🔬 Perfilar", key="_perf_botao"):
+            st.session_state["_perf_perfilar"] = perfilador
+            st.rerun()
+        perfilado = next((r for r in reversed(historico) if r.get("perfil")), None)
+        if perfilado:
+            st.caption(f"Perfil ({perfilado['perfilador']}) da execução de {perfilado['total'] * 1000:.0f} ms")
+            st.code(perfilado["perfil"], language="text")
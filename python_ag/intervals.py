@@ -0,0 +1,110 @@
+"""Índice de intervalos de ocupação por veículo.
+
+Guarda, para cada veículo, os períodos alugados como listas ordenadas de
+início e fim (em dias ordinais, intervalo semiaberto ``[inicio, fim)``).
+Como as locações de um mesmo veículo nunca se sobrepõem, fins também ficam
+ordenados e "o veículo está livre entre A e B?" se resolve com uma busca
+binária. Locações em andamento (``data_fim`` vazio) ficam em aberto até o
+infinito.
+"""
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+ABERTO = sys.maxsize
+_ORDINAL_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _dia(valor):
+    """Converte date/datetime/Timestamp (ou None = em aberto) para dia ordinal."""
+    if valor is None or valor is pd.NaT:
+        return ABERTO
+    if isinstance(valor, (int, np.integer)):
+        return int(valor)
+    if isinstance(valor, date):
+        return valor.toordinal()
+    return pd.Timestamp(valor).toordinal()
+
+
+def _dias(serie):
+    """Versão vetorizada de ``_dia`` para uma coluna datetime64."""
+    dias = pd.to_datetime(serie).to_numpy().astype("datetime64[D]")
+    ordinais = dias.astype(np.int64) + _ORDINAL_EPOCH
+    return np.where(np.isnat(dias), ABERTO, ordinais)
+
+
+class VehicleIntervals:
+    def __init__(self):
+        self._inicios = defaultdict(list)
+        self._fins = defaultdict(list)
+
+    @classmethod
+    def from_locacoes(cls, locacoes_df, inicio="data_inicio", fim="data_fim"):
+        """Monta o índice a partir de um DataFrame de locações."""
+        indice = cls()
+        if locacoes_df.empty:
+            return indice
+        veiculos = locacoes_df["id_veiculo"].to_numpy()
+        inicios = _dias(locacoes_df[inicio])
+        fins = _dias(locacoes_df[fim])
+        # Ordena por (veículo, início) numa chave só; ordinais cabem em 22 bits
+        ordem = np.argsort((veiculos.astype(np.int64) << 22) | inicios)
+        veiculos, inicios, fins = veiculos[ordem], inicios[ordem], fins[ordem]
+        cortes = np.r_[0, np.flatnonzero(np.diff(veiculos)) + 1, len(veiculos)].tolist()
+        inicios, fins = inicios.tolist(), fins.tolist()
+        for id_veiculo, a, b in zip(veiculos[cortes[:-1]].tolist(), cortes[:-1], cortes[1:]):
+            indice._inicios[id_veiculo] = inicios[a:b]
+            indice._fins[id_veiculo] = fins[a:b]
+        return indice
+
+    def __len__(self):
+        return sum(len(inicios) for inicios in self._inicios.values())
+
+    def _conflito(self, id_veiculo, inicio, fim):
+        inicios = self._inicios.get(id_veiculo)
+        if not inicios:
+            return None
+        # Último intervalo que começa antes do fim pedido
+        i = bisect_left(inicios, fim) - 1
+        if i >= 0 and self._fins[id_veiculo][i] > inicio:
+            return i
+        return None
+
+    def is_free(self, id_veiculo, inicio, fim=None):
+        """Indica se o veículo está livre em ``[inicio, fim)`` (fim None = em aberto)."""
+        return self._conflito(id_veiculo, _dia(inicio), _dia(fim)) is None
+
+    def add(self, id_veiculo, inicio, fim=None):
+        """Registra uma locação. Levanta ValueError se houver sobreposição."""
+        inicio, fim = _dia(inicio), _dia(fim)
+        if fim <= inicio:
+            raise ValueError("data_fim deve ser posterior a data_inicio")
+        if self._conflito(id_veiculo, inicio, fim) is not None:
+            raise ValueError(f"Veículo {id_veiculo} já está alugado nesse período")
+        inicios = self._inicios[id_veiculo]
+        i = bisect_left(inicios, inicio)
+        inicios.insert(i, inicio)
+        self._fins[id_veiculo].insert(i, fim)
+
+    def close(self, id_veiculo, inicio, fim):
+        """Encerra a locação em aberto que começou em ``inicio``."""
+        inicio, fim = _dia(inicio), _dia(fim)
+        inicios = self._inicios.get(id_veiculo, [])
+        i = bisect_left(inicios, inicio)
+        if i == len(inicios) or inicios[i] != inicio:
+            raise KeyError(f"Veículo {id_veiculo} não tem locação iniciada nessa data")
+        self._fins[id_veiculo][i] = fim
+
+    def free_vehicles(self, ids_veiculos, inicio, fim=None):
+        """Filtra ``ids_veiculos`` deixando só os livres em ``[inicio, fim)``."""
+        inicio, fim = _dia(inicio), _dia(fim)
+        return [v for v in ids_veiculos if self._conflito(v, inicio, fim) is None]
+
+    def busy_vehicles(self, dia):
+        """IDs dos veículos ocupados no dia informado."""
+        dia = _dia(dia)
+        return [v for v in self._inicios if self._conflito(v, dia, dia + 1) is not None]
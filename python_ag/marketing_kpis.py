@@ -0,0 +1,125 @@
+"""KPIs de marketing da Python Rent a Car em janelas móveis, atualizados incrementalmente.
+
+Os períodos (dias ou meses) ficam em ordem, guardados como somas acumuladas
+de cada medida: a soma de uma janela é a diferença entre duas linhas do
+acumulado, e o início da janela sai de um ``searchsorted`` nas datas. Os
+KPIs das janelas (3, 6 e 12 meses por padrão) são guardados por período e,
+ao acrescentar períodos novos com ``append``, só as linhas novas são
+calculadas: o custo é proporcional aos dados novos, não ao histórico.
+
+As janelas são em meses de calendário e terminam no próprio período: para
+2024-03-15 e 3 meses, entram os períodos de 2023-12-16 a 2024-03-15.
+
+KPIs de cada janela:
+
+- ``conversao``: aluguéis confirmados / cotações;
+- ``cac``: investimento em marketing / novos clientes;
+- ``eficiencia``: aluguéis confirmados por R$ 1.000 investidos.
+"""
+import numpy as np
+import pandas as pd
+
+JANELAS = (3, 6, 12)
+MEDIDAS = ("cotacoes", "alugueis_confirmados", "investimento_marketing", "novos_clientes")
+KPIS = ("conversao", "cac", "eficiencia")
+
+
+def _razao(a, b):
+    """``a / b`` com NaN onde ``b`` é zero."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b > 0, a / b, np.nan)
+
+
+class MarketingKPIs:
+    def __init__(self, janelas=JANELAS, capacidade=64):
+        self.janelas = tuple(janelas)
+        self.n = 0
+        self._datas = np.empty(capacidade, dtype="datetime64[D]")
+        # Linha i = soma dos i primeiros períodos (a linha 0 é zero)
+        self._acum = np.zeros((capacidade + 1, len(MEDIDAS)))
+        self._kpis = {meses: np.empty((capacidade, len(KPIS))) for meses in self.janelas}
+
+    @classmethod
+    def from_frame(cls, df, data="data", janelas=JANELAS):
+        """Monta o histórico a partir de um DataFrame com ``data`` e as ``MEDIDAS``."""
+        kpis = cls(janelas, capacidade=max(len(df), 1))
+        kpis.append(df, data)
+        return kpis
+
+    def _reservar(self, n):
+        """Garante espaço para ``n`` períodos, dobrando a capacidade quando preciso."""
+        capacidade = len(self._datas)
+        if n <= capacidade:
+            return
+        capacidade = max(n, 2 * capacidade)
+        datas = np.empty(capacidade, dtype=self._datas.dtype)
+        datas[:self.n] = self._datas[:self.n]
+        acum = np.zeros((capacidade + 1, len(MEDIDAS)))
+        acum[:self.n + 1] = self._acum[:self.n + 1]
+        for meses, valores in self._kpis.items():
+            novos = np.empty((capacidade, len(KPIS)))
+            novos[:self.n] = valores[:self.n]
+            self._kpis[meses] = novos
+        self._datas, self._acum = datas, acum
+
+    def append(self, df, data="data"):
+        """Acrescenta períodos com ``data`` e as ``MEDIDAS``.
+
+        Linhas do mesmo dia são somadas, inclusive com o último período já
+        guardado; datas anteriores a ele levantam ``ValueError``.
+        """
+        if not len(df):
+            return
+        datas = pd.to_datetime(df[data]).to_numpy().astype("datetime64[D]")
+        datas, grupo = np.unique(datas, return_inverse=True)
+        valores = np.zeros((len(datas), len(MEDIDAS)))
+        np.add.at(valores, grupo, df[list(MEDIDAS)].to_numpy(dtype=float))
+
+        if self.n:
+            ultima = self._datas[self.n - 1]
+            if datas[0] < ultima:
+                raise ValueError(f"Período {datas[0]} anterior ao último já registrado ({ultima})")
+            if datas[0] == ultima:
+                # Completa o último período: ele é refeito junto com os novos
+                self.n -= 1
+                valores[0] += self._acum[self.n + 1] - self._acum[self.n]
+
+        inicio, fim = self.n, self.n + len(datas)
+        self._reservar(fim)
+        self._datas[inicio:fim] = datas
+        self._acum[inicio + 1:fim + 1] = self._acum[inicio] + np.cumsum(valores, axis=0)
+        self.n = fim
+        self._atualizar(inicio)
+
+    def _atualizar(self, desde):
+        """Calcula os KPIs das janelas que terminam nos períodos a partir de ``desde``."""
+        datas = self._datas[desde:self.n]
+        fim = self._acum[desde + 1:self.n + 1]
+        for meses in self.janelas:
+            limites = (pd.DatetimeIndex(datas) - pd.DateOffset(months=meses)).to_numpy()
+            inicio = np.searchsorted(self._datas[:self.n], limites.astype("datetime64[D]"), side="right")
+            cotacoes, alugueis, investimento, novos = (fim - self._acum[inicio]).T
+            self._kpis[meses][desde:self.n] = np.column_stack([
+                _razao(alugueis, cotacoes),
+                _razao(investimento, novos),
+                _razao(alugueis * 1000, investimento),
+            ])
+
+    def dates(self):
+        return pd.DatetimeIndex(self._datas[:self.n], name="data")
+
+    def periods(self):
+        """Medidas de cada período (sem janela)."""
+        valores = np.diff(self._acum[:self.n + 1], axis=0)
+        return pd.DataFrame(valores, index=self.dates(), columns=list(MEDIDAS))
+
+    def rolling(self, meses):
+        """KPIs da janela de ``meses`` terminando em cada período."""
+        return pd.DataFrame(self._kpis[meses][:self.n], index=self.dates(), columns=list(KPIS))
+
+    def latest(self):
+        """KPIs de cada janela no último período (uma linha por janela)."""
+        if not self.n:
+            return pd.DataFrame(columns=list(KPIS), index=pd.Index([], name="meses"))
+        return pd.DataFrame([self._kpis[meses][self.n - 1] for meses in self.janelas],
+                            index=pd.Index(self.janelas, name="meses"), columns=list(KPIS))
@@ -0,0 +1,160 @@
+"""Cargas em cache de cada página e o aquecimento delas na subida do processo.
+
+As funções de carga ficam aqui, e não nos scripts das páginas, para que o
+``app.py`` possa chamá-las antes de alguém abrir a página: os caches do
+Streamlit (``st.cache_data``/``st.cache_resource``) são do processo, então o
+primeiro visitante encontra os dados prontos.
+
+``start_warm_up`` roda uma vez por processo, numa thread em segundo plano, e
+dispara todas as cargas em paralelo (``warm_up``). Se uma página pedir um dado
+que ainda está sendo carregado, ela espera a carga em andamento em vez de
+repeti-la. Terminada a pré-carga, começa a atualização periódica dos dados de
+Cars e Parts (``REFRESHER``).
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import streamlit as st
+
+from python_ag import data_source, refresher, rent_a_car, repair_shop, synthetic
+from python_ag.filter_index import FilterIndex
+from python_ag.fleet_kpis import fleet_kpis
+from python_ag.intervals import VehicleIntervals
+from python_ag.marketing_kpis import MarketingKPIs
+from python_ag.sales_cube import SalesCube
+
+logger = logging.getLogger(__name__)
+
+# Python Cars: colunas usadas pelo dashboard
+COLUNAS_CARS = ["Marca", "Modelo", "Estado", "Origem_lead"]
+
+# Python Rent a Car: parâmetros dos dados gerados. ``PYTHON_AG_RENT_LOCACOES``
+# muda o número de locações (ex.: no benchmark), com frota e clientes nas
+# proporções do gerador sintético
+RENT_A_CAR = {"seed": 42, "num_clientes": 100, "num_veiculos": 50, "num_locacoes": 555}
+if os.environ.get("PYTHON_AG_RENT_LOCACOES"):
+    RENT_A_CAR = {"seed": 42, **synthetic.rent_a_car_params(int(os.environ["PYTHON_AG_RENT_LOCACOES"]))}
+
+
+# Índice de filtros e cubo ficam num único objeto por processo, compartilhado
+# entre sessões, e são trocados pela thread de atualização quando a fonte muda
+# (ver refresher); uma atualização que falha mantém a versão anterior
+REFRESHER = refresher.Refresher()
+
+
+# Só as colunas usadas, já como category; o DataFrame não é guardado, só o índice
+def _montar_indice_cars():
+    df = data_source.load_dataset("vendas_loja_seminovos", columns=COLUNAS_CARS)
+    return FilterIndex(df, COLUNAS_CARS, version=data_source.dataset_version("vendas_loja_seminovos"))
+
+
+CARS_INDEX = REFRESHER.register(refresher.Refreshable("vendas_loja_seminovos", _montar_indice_cars))
+
+# Cubo mês × região × canal × produto. As vendas são lidas e agregadas em
+# blocos, sem carregar o arquivo inteiro
+PARTS_CUBE = REFRESHER.register(refresher.Refreshable(
+    "vendas_acessorios_fake", lambda: SalesCube.from_dataset("vendas_acessorios_fake")
+))
+
+
+def load_cars_index():
+    return CARS_INDEX.get()
+
+
+def load_parts_cube():
+    return PARTS_CUBE.get()
+
+
+def refresh_warning(item):
+    """Avisa na página quando a última atualização falhou e os dados são os anteriores."""
+    if item.last_error and item.loaded_at:
+        carregado = time.strftime("%d/%m %H:%M", time.localtime(item.loaded_at))
+        st.caption(f"⚠️ Não foi possível atualizar os dados; exibindo a versão de {carregado}.")
+
+
+# Um banco por processo, compartilhado por todas as sessões; na primeira
+# execução ele é populado com os CSVs. Se a carga falhar, a exceção sobe sem
+# entrar no cache (a próxima execução tenta de novo) e a página mostra o erro
+@st.cache_resource
+def get_repair_db():
+    db = repair_shop.RepairShopDB()
+    if db.is_empty():
+        db.seed(*repair_shop.load_seed_data())
+    return db
+
+
+# Gera os dados uma vez por (semente, escala, dia) e compartilha entre sessões;
+# combinações antigas são descartadas quando o cache passa de max_entries
+@st.cache_data(max_entries=8, show_spinner="Gerando dados...")
+def load_rent_data(seed, num_clientes, num_veiculos, num_locacoes, hoje):
+    return rent_a_car.generate_data(seed=seed,
+                                    num_clientes=num_clientes,
+                                    num_veiculos=num_veiculos,
+                                    num_locacoes=num_locacoes,
+                                    hoje=hoje)
+
+
+# Janelas móveis de marketing, montadas uma vez por geração dos dados; períodos
+# novos entram com MarketingKPIs.append, sem recalcular o histórico
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_marketing_kpis(seed, num_clientes, num_veiculos, num_locacoes, hoje):
+    dados = load_rent_data(seed, num_clientes, num_veiculos, num_locacoes, hoje)
+    return MarketingKPIs.from_frame(dados["marketing"], data="mes")
+
+
+# Índice de ocupação e KPIs da frota, uma vez por geração dos dados: numa
+# reexecução a página só consulta, sem varrer as locações de novo
+@st.cache_resource(max_entries=8, show_spinner=False)
+def load_rent_occupancy(seed, num_clientes, num_veiculos, num_locacoes, hoje):
+    dados = load_rent_data(seed, num_clientes, num_veiculos, num_locacoes, hoje)
+    return VehicleIntervals.from_locacoes(dados["locacoes"])
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_fleet_kpis(seed, num_clientes, num_veiculos, num_locacoes, hoje, por=None):
+    dados = load_rent_data(seed, num_clientes, num_veiculos, num_locacoes, hoje)
+    return fleet_kpis(dados["locacoes"], dados["veiculos"], por=por, hoje=hoje)
+
+
+def warm_up(max_workers=None):
+    """Executa as cargas de todas as páginas em paralelo.
+
+    Retorna o tempo (s) de cada carga; falhas são registradas no log e não
+    interrompem as outras.
+    """
+    cargas = {
+        "cars": load_cars_index,
+        "parts": load_parts_cube,
+        "repair_shop": get_repair_db,
+        "rent_a_car": lambda: load_marketing_kpis(**RENT_A_CAR, hoje=date.today()),
+    }
+
+    def medir(nome, carga):
+        inicio = time.perf_counter()
+        try:
+            carga()
+        except Exception:
+            logger.exception("Falha ao pré-carregar %s", nome)
+        return time.perf_counter() - inicio
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(cargas), thread_name_prefix="warm_up") as pool:
+        futuros = {nome: pool.submit(medir, nome, carga) for nome, carga in cargas.items()}
+    tempos = {nome: futuro.result() for nome, futuro in futuros.items()}
+    logger.info("Pré-carga concluída: %s", {nome: round(t, 3) for nome, t in tempos.items()})
+    return tempos
+
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    """Dispara ``warm_up`` em segundo plano, uma vez por processo, e depois a atualização periódica."""
+    def aquecer():
+        warm_up()
+        REFRESHER.start()
+
+    thread = threading.Thread(target=aquecer, name="warm_up", daemon=True)
+    thread.start()
+    return thread
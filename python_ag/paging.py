@@ -0,0 +1,52 @@
+"""Tabela paginada no servidor para o Streamlit.
+
+Em vez de mandar a listagem inteira para ``st.dataframe`` a cada rerun, só a
+página visível é consultada e enviada ao navegador. A ordenação também é
+feita na consulta, então ordenar por outra coluna não exige trazer as
+outras páginas.
+
+``fonte`` é qualquer objeto com ``total(listagem)`` e
+``pagina(listagem, ordem, decrescente, pagina, tamanho)`` devolvendo uma
+tabela Arrow (ver ``RepairShopDB``), que guarda as páginas já consultadas.
+"""
+import math
+
+TAMANHO_PAGINA = 50
+DIRECOES = ("Crescente", "Decrescente")
+
+
+def paginated_dataframe(fonte, listagem, key, rotulos=None, tamanho=TAMANHO_PAGINA):
+    """Desenha a página atual de ``listagem`` com controles de ordem e página.
+
+    ``rotulos`` renomeia colunas na tela. Retorna o total de linhas.
+    """
+    import streamlit as st
+
+    rotulos = rotulos or {}
+    total = fonte.total(listagem)
+    paginas = max(math.ceil(total / tamanho), 1)
+
+    # Outro filtro ou outra ordenação volta para a primeira página
+    chave_pagina = f"{key}_pagina"
+    consulta = (listagem, st.session_state.get(f"{key}_ordem"),
+                st.session_state.get(f"{key}_direcao", DIRECOES[0]))
+    if st.session_state.get(f"{key}_consulta") != consulta:
+        st.session_state[f"{key}_consulta"] = consulta
+        st.session_state[chave_pagina] = 1
+    elif st.session_state.get(chave_pagina, 1) > paginas:
+        st.session_state[chave_pagina] = paginas
+
+    col_ordem, col_direcao, col_pagina, col_info = st.columns([3, 2, 2, 3])
+    ordem = col_ordem.selectbox(
+        "Ordenar por", [None, *listagem.ordenaveis], key=f"{key}_ordem",
+        format_func=lambda c: "Padrão" if c is None else rotulos.get(c, c),
+    )
+    direcao = col_direcao.selectbox("Direção", DIRECOES, key=f"{key}_direcao")
+    pagina = col_pagina.number_input("Página", min_value=1, max_value=paginas, step=1, key=chave_pagina)
+    col_info.caption(f"{total:,} linhas · página {pagina} de {paginas}".replace(",", "."))
+
+    tabela = fonte.pagina(listagem, ordem, direcao == DIRECOES[1], pagina - 1, tamanho)
+    if rotulos:
+        tabela = tabela.rename_columns([rotulos.get(c, c) for c in tabela.column_names])
+    st.dataframe(tabela, use_container_width=True, hide_index=True)
+    return total
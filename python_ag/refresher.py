@@ -0,0 +1,112 @@
+"""Atualização em segundo plano dos dados derivados dos datasets.
+
+Em vez de um TTL, em que o usuário que pega o cache vencido paga a recarga
+inteira, uma thread verifica as fontes de tempos em tempos
+(``PYTHON_AG_REFRESH_SECONDS``, padrão: 300) e, quando uma fonte mudou,
+reconstrói o objeto derivado (índice, cubo...) e o troca de uma vez só
+(stale-while-revalidate):
+
+- quem lê (``Refreshable.get``) nunca espera uma recarga: recebe sempre a
+  última versão boa;
+- uma recarga que falha (fonte fora do ar, CSV quebrado) é registrada em
+  ``last_error`` e a versão anterior continua valendo.
+
+Só a primeira carga é síncrona, e só ela pode levantar exceção.
+"""
+import logging
+import os
+import threading
+import time
+
+from python_ag import data_source
+
+INTERVALO = float(os.environ.get("PYTHON_AG_REFRESH_SECONDS", 300))
+
+logger = logging.getLogger(__name__)
+
+
+class Refreshable:
+    def __init__(self, dataset, construir):
+        """``construir()`` monta o objeto a partir do espelho do ``dataset``."""
+        self.dataset = dataset
+        self._construir = construir
+        # (objeto, versão do espelho, horário da carga), trocado de uma vez
+        self._atual = None
+        self._lock = threading.Lock()
+        self.last_error = None
+
+    def _carregar(self):
+        valor = self._construir()
+        # Índices e cubos guardam a versão com que foram montados
+        versao = getattr(valor, "version", None) or data_source.dataset_version(self.dataset)
+        self._atual = (valor, versao, time.time())
+
+    def get(self):
+        """Última versão boa; na primeira chamada, carrega (e pode levantar exceção)."""
+        atual = self._atual
+        if atual is None:
+            with self._lock:
+                if self._atual is None:
+                    self._carregar()
+            atual = self._atual
+        return atual[0]
+
+    @property
+    def version(self):
+        return self._atual[1] if self._atual else None
+
+    @property
+    def loaded_at(self):
+        return self._atual[2] if self._atual else None
+
+    def refresh(self):
+        """Reconstrói se a fonte mudou. Retorna True se trocou a versão servida."""
+        with self._lock:
+            try:
+                data_source.refresh_mirror(data_source.DATASETS[self.dataset])
+                if self._atual is not None and data_source.dataset_version(self.dataset) == self._atual[1]:
+                    self.last_error = None
+                    return False
+                self._carregar()
+            except Exception as e:
+                self.last_error = (time.time(), f"{type(e).__name__}: {e}")
+                logger.exception("Falha ao atualizar %s; mantendo a versão anterior", self.dataset)
+                return False
+        self.last_error = None
+        logger.info("%s atualizado (versão %s)", self.dataset, self.version)
+        return True
+
+
+class Refresher:
+    def __init__(self, intervalo=INTERVALO):
+        self.intervalo = intervalo
+        self._itens = []
+        self._thread = None
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+
+    def register(self, item):
+        self._itens.append(item)
+        return item
+
+    def refresh_all(self):
+        return {item.dataset: item.refresh() for item in self._itens}
+
+    def _rodar(self):
+        while not self._parar.wait(self.intervalo):
+            self.refresh_all()
+
+    def start(self):
+        """Inicia a thread de atualização (uma só, mesmo com várias chamadas)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._parar.clear()
+                self._thread = threading.Thread(target=self._rodar, name="refresher", daemon=True)
+                try:
+                    self._thread.start()
+                except RuntimeError:
+                    # Processo encerrando antes do fim da pré-carga
+                    self._thread = None
+
+    def stop(self):
+        self._parar.set()
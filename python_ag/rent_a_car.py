@@ -0,0 +1,275 @@
+"""Gerador vetorizado dos dados fictícios da Python Rent a Car.
+
+Todos os sorteios saem de um único ``numpy.random.Generator`` semeado, então a
+mesma semente e os mesmos parâmetros (inclusive ``hoje``, que tem padrão
+fixo) sempre produzem as mesmas tabelas. O Faker só é usado para montar
+pequenos "pools" de nomes, uma vez por semente, que depois são combinados com
+NumPy; nada é gerado linha a linha.
+"""
+import unicodedata
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from python_ag.compact import compact
+
+# Categorias e faixas de preço por dia
+CATEGORIAS = {
+    'Econômico': (98, 157),
+    'Intermediário': (180, 247),
+    'SUV': (299, 433)
+}
+
+# Marcas, modelos e categorias
+MARCAS_MODELOS_CATEGORIAS = [
+    ('Fiat', 'Argo', 'Econômico'),
+    ('Chevrolet', 'Onix', 'Econômico'),
+    ('Volkswagen', 'Gol', 'Econômico'),
+    ('Hyundai', 'HB20', 'Intermediário'),
+    ('Ford', 'Ka', 'Econômico'),
+    ('Toyota', 'Corolla', 'Intermediário'),
+    ('Jeep', 'Renegade', 'SUV'),
+    ('Honda', 'HR-V', 'SUV')
+]
+
+CIDADES_ESTADOS = {
+    "São Paulo": "SP",
+    "Rio de Janeiro": "RJ",
+    "Belo Horizonte": "MG",
+    "Porto Alegre": "RS",
+    "Curitiba": "PR"
+}
+
+DOMINIOS_EMAIL = ['gmail.com', 'hotmail.com', 'yahoo.com.br', 'uol.com.br', 'outlook.com.br']
+
+# Janela em que as locações acontecem, em dias até ``hoje``
+JANELA_LOCACOES_DIAS = 730
+# ``hoje`` padrão: as locações cobrem 2023 e 2024, como os dados de marketing
+DATA_REFERENCIA = date(2025, 1, 1)
+TAMANHO_POOL_NOMES = 500
+# Colunas de texto repetitivo de cada tabela, guardadas como category
+COLUNAS_CATEGORICAS = {
+    'clientes': ('nome',),
+    'veiculos': ('marca', 'modelo', 'categoria', 'status'),
+    'lojas': ('cidade', 'estado'),
+}
+
+
+def _slug(texto):
+    texto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower().replace(" ", "")
+
+
+def _digitos(largura):
+    """Tabela de blocos de dígitos com zeros à esquerda ("000" ... "999")."""
+    return np.array([str(i).zfill(largura) for i in range(10 ** largura)], dtype=object)
+
+
+_DIGITOS_1, _DIGITOS_2, _DIGITOS_3, _DIGITOS_4 = (_digitos(n) for n in (1, 2, 3, 4))
+_LETRAS = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"), dtype=object)
+
+
+def _format_cpf(base):
+    """CPFs válidos (com dígitos verificadores) a partir de bases de 9 dígitos."""
+    digitos = (base[:, None] // 10 ** np.arange(8, -1, -1)) % 10
+    d1 = (digitos @ np.arange(10, 1, -1)) * 10 % 11 % 10
+    d2 = (np.column_stack([digitos, d1]) @ np.arange(11, 1, -1)) * 10 % 11 % 10
+    return (_DIGITOS_3[base // 10 ** 6] + "." + _DIGITOS_3[base // 1000 % 1000] + "."
+            + _DIGITOS_3[base % 1000] + "-" + _DIGITOS_2[d1 * 10 + d2])
+
+
+def _format_placa(codigo):
+    """Placas no padrão Mercosul (ABC1D23) a partir de inteiros distintos."""
+    partes = []
+    for base in (26, 26, 26, 10, 26, 100):
+        partes.append(codigo % base)
+        codigo = codigo // base
+    l1, l2, l3, n1, l4, n2 = partes
+    return (_LETRAS[l1] + _LETRAS[l2] + _LETRAS[l3] + _DIGITOS_1[n1] + _LETRAS[l4]
+            + _DIGITOS_2[n2])
+
+
+@lru_cache(maxsize=8)
+def _pools_nomes(seed):
+    """Todas as combinações nome + sobrenome do Faker e os e-mails correspondentes.
+
+    Montados uma vez por semente e processo; os arrays são só de leitura.
+    """
+    from faker import Faker
+
+    fake = Faker('pt_BR')
+    fake.seed_instance(seed)
+    primeiros = [fake.first_name() for _ in range(TAMANHO_POOL_NOMES)]
+    ultimos = [fake.last_name() for _ in range(TAMANHO_POOL_NOMES)]
+    pool_nomes = np.array([f"{p} {u}" for p in primeiros for u in ultimos], dtype=object)
+    slug_primeiros = [_slug(p) for p in primeiros]
+    slug_ultimos = [_slug(u) for u in ultimos]
+    pool_emails = np.array([f"{p}.{u}" for p in slug_primeiros for u in slug_ultimos], dtype=object)
+    pool_nomes.setflags(write=False)
+    pool_emails.setflags(write=False)
+    return pool_nomes, pool_emails
+
+
+def generate_clientes(rng, num_clientes, seed=42):
+    # Cada cliente sorteia um índice no pool de nomes da semente
+    pool_nomes, pool_emails = _pools_nomes(seed)
+    i_nome = rng.integers(0, len(pool_nomes), num_clientes)
+    nomes = pool_nomes[i_nome]
+    dominios = np.array(DOMINIOS_EMAIL, dtype=object)
+    emails = (pool_emails[i_nome] + _DIGITOS_2[rng.integers(1, 100, num_clientes)] + "@"
+              + dominios[rng.integers(0, len(dominios), num_clientes)])
+
+    ddd = _DIGITOS_2[rng.integers(11, 100, num_clientes)]
+    numero = rng.integers(0, 10 ** 8, num_clientes)
+    telefones = "(" + ddd + ") 9" + _DIGITOS_4[numero // 10 ** 4] + "-" + _DIGITOS_4[numero % 10 ** 4]
+
+    cpfs = _format_cpf(rng.choice(10 ** 9, num_clientes, replace=False))
+
+    return pd.DataFrame({
+        'id_cliente': np.arange(1, num_clientes + 1),
+        'nome': nomes,
+        'cpf': cpfs,
+        'email': emails,
+        'telefone': telefones,
+        'nps': rng.choice([10, 9, 8, 7, 6, 5, 4], num_clientes, p=[0.3, 0.3, 0.2, 0.05, 0.05, 0.05, 0.05])
+    })
+
+
+def generate_veiculos(rng, num_veiculos):
+    modelos = pd.DataFrame(MARCAS_MODELOS_CATEGORIAS, columns=['marca', 'modelo', 'categoria'])
+    escolha = modelos.iloc[rng.integers(0, len(modelos), num_veiculos)].reset_index(drop=True)
+    placas = _format_placa(rng.choice(26 ** 4 * 10 ** 3, num_veiculos, replace=False))
+    return pd.DataFrame({
+        'id_veiculo': np.arange(1, num_veiculos + 1),
+        'marca': escolha['marca'].to_numpy(),
+        'modelo': escolha['modelo'].to_numpy(),
+        'categoria': escolha['categoria'].to_numpy(),
+        'ano': rng.integers(2018, 2024, num_veiculos),
+        'placa': placas,
+        'status': 'disponível',
+        'km_total': rng.integers(20000, 150001, num_veiculos),
+        'tempo_manutencao_dias': rng.integers(0, 21, num_veiculos)
+    })
+
+
+def generate_lojas():
+    return pd.DataFrame([
+        {"id_loja": i, "nome_loja": f"Locadora {cidade}", "cidade": cidade, "estado": estado}
+        for i, (cidade, estado) in enumerate(CIDADES_ESTADOS.items(), start=1)
+    ])
+
+
+def generate_locacoes(rng, veiculos_df, num_clientes, num_lojas, num_locacoes, hoje, prob_ativa=0.2):
+    """Sorteia locações sem sobreposição por veículo.
+
+    As locações de cada veículo são enfileiradas: as durações são somadas e o
+    tempo livre da janela é repartido em folgas aleatórias entre elas. Se a
+    frota não comporta ``num_locacoes`` na janela, as que não cabem são
+    descartadas (o DataFrame pode vir com menos linhas). Com probabilidade
+    ``prob_ativa`` a última locação de cada veículo fica em andamento
+    (``data_fim`` vazio).
+    """
+    num_veiculos = len(veiculos_df)
+    id_veiculo = rng.integers(1, num_veiculos + 1, num_locacoes)
+    duracao = rng.integers(1, 16, num_locacoes)
+    posicao = rng.random(num_locacoes)
+
+    # Agrupa por veículo e, dentro dele, pela posição sorteada (posicao < 1)
+    ordem = np.argsort(id_veiculo + posicao)
+    id_veiculo, duracao, posicao = id_veiculo[ordem], duracao[ordem], posicao[ordem]
+    inicio_grupo = np.r_[0, np.flatnonzero(np.diff(id_veiculo)) + 1]
+    tamanho_grupo = np.diff(np.r_[inicio_grupo, num_locacoes])
+
+    soma = np.cumsum(duracao)
+    base_grupo = np.repeat(soma[inicio_grupo] - duracao[inicio_grupo], tamanho_grupo)
+    ocupado_ate = soma - base_grupo
+    cabe = ocupado_ate <= JANELA_LOCACOES_DIAS
+
+    total_grupo = np.maximum.reduceat(np.where(cabe, ocupado_ate, 0), inicio_grupo)
+    folga = JANELA_LOCACOES_DIAS - np.repeat(total_grupo, tamanho_grupo)
+    inicio_dia = (np.floor(posicao * folga) + ocupado_ate - duracao).astype(np.int64)
+
+    # Só a última locação de cada veículo que cabe na janela pode ficar ativa
+    ultima_valida = np.zeros(num_locacoes, dtype=bool)
+    indices_cabem = np.flatnonzero(cabe)
+    if len(indices_cabem):
+        ultimos = np.r_[np.flatnonzero(np.diff(id_veiculo[indices_cabem])), len(indices_cabem) - 1]
+        ultima_valida[indices_cabem[ultimos]] = True
+    ativa = ultima_valida & (rng.random(num_locacoes) < prob_ativa)
+
+    id_veiculo, duracao, inicio_dia, ativa = id_veiculo[cabe], duracao[cabe], inicio_dia[cabe], ativa[cabe]
+    n = len(id_veiculo)
+
+    origem = np.datetime64(hoje, "D") - JANELA_LOCACOES_DIAS
+    data_inicio = origem + inicio_dia
+    data_fim = np.where(ativa, np.datetime64("NaT"), data_inicio + duracao)
+
+    categorias = list(CATEGORIAS)
+    codigo_categoria = pd.Categorical(veiculos_df['categoria'], categories=categorias).codes
+    cat_locacao = codigo_categoria[id_veiculo - 1]
+    faixas = np.array(list(CATEGORIAS.values()))
+    preco_dia = rng.integers(faixas[cat_locacao, 0], faixas[cat_locacao, 1] + 1)
+    receita = np.where(ativa, 0, preco_dia * duracao)
+    custo = receita * rng.uniform(0.4, 0.7, n)
+
+    locacoes_df = pd.DataFrame({
+        'id_cliente': rng.integers(1, num_clientes + 1, n),
+        'id_veiculo': id_veiculo,
+        'id_loja': rng.integers(1, num_lojas + 1, n),
+        'data_inicio': data_inicio.astype('datetime64[s]'),
+        'data_fim': data_fim.astype('datetime64[s]'),
+        'receita': receita,
+        'custo': custo,
+        'km_rodado': rng.integers(100, 1001, n),
+        'reclamacao': (rng.random(n) < 0.1).astype(np.int64),
+        'sinistro': (rng.random(n) < 0.05).astype(np.int64),
+        'preco_dia': preco_dia
+    })
+    locacoes_df = locacoes_df.sort_values(['data_inicio', 'id_veiculo'], kind='stable', ignore_index=True)
+    locacoes_df.insert(0, 'id_locacao', np.arange(1, n + 1))
+    return locacoes_df
+
+
+def generate_marketing(rng, inicio='2023-01-01', fim='2024-12-01'):
+    meses = pd.date_range(start=inicio, end=fim, freq='MS')
+    n = len(meses)
+    cotacoes = rng.integers(150, 401, n)
+    alugueis_confirmados = rng.integers((cotacoes * 0.3).astype(np.int64), cotacoes + 1)
+    investimento_marketing = rng.integers(5000, 15001, n)
+    novos_clientes = rng.integers(20, 81, n)
+    return pd.DataFrame({
+        'mes': meses.strftime('%Y-%m'),
+        'cotacoes': cotacoes,
+        'alugueis_confirmados': alugueis_confirmados,
+        'taxa_conversao': np.round(alugueis_confirmados / cotacoes, 2),
+        'investimento_marketing': investimento_marketing,
+        'novos_clientes': novos_clientes,
+        'cac': np.round(investimento_marketing / novos_clientes, 2)
+    })
+
+
+def generate_data(seed=42, num_clientes=100, num_veiculos=50, num_locacoes=555, hoje=DATA_REFERENCIA,
+                  compact_dtypes=True):
+    """Gera todas as tabelas da locadora. Retorna um dict de DataFrames.
+
+    ``hoje`` é o fim da janela das locações; com o padrão fixo
+    (``DATA_REFERENCIA``) a mesma semente gera os mesmos dados em qualquer
+    dia. Com ``compact_dtypes`` (padrão) as tabelas saem com os tipos de
+    ``python_ag.compact``.
+    """
+    rng = np.random.default_rng(seed)
+
+    veiculos_df = generate_veiculos(rng, num_veiculos)
+    lojas_df = generate_lojas()
+    dados = {
+        'clientes': generate_clientes(rng, num_clientes, seed),
+        'veiculos': veiculos_df,
+        'lojas': lojas_df,
+        'locacoes': generate_locacoes(rng, veiculos_df, num_clientes, len(lojas_df), num_locacoes, hoje),
+        'marketing': generate_marketing(rng),
+    }
+    if compact_dtypes:
+        dados = {nome: compact(df, COLUNAS_CATEGORICAS.get(nome, ())) for nome, df in dados.items()}
+    return dados
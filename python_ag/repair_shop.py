@@ -0,0 +1,619 @@
+"""Armazenamento dos cadastros da Python Car Repair Shop em SQLite.
+
+Clientes, veículos e agendamentos ficam num banco SQLite (modo WAL) único por
+processo, compartilhado por todas as sessões do Streamlit: um agendamento
+feito numa sessão aparece nas outras e sobrevive a reinícios. As páginas
+consultam só as linhas de que precisam em vez de guardar cópias completas
+das tabelas em ``st.session_state``.
+
+As conexões ficam num pool (``check_same_thread=False``), já que cada sessão
+roda o script numa thread diferente. O ID de cada cadastro novo vem da
+``INTEGER PRIMARY KEY`` do SQLite, então inserir custa o mesmo com 300 ou
+300 mil agendamentos.
+
+As buscas por nome, CPF e placa usam índices em memória (``search_index``),
+montados na primeira busca e atualizados a cada cadastro feito neste processo.
+
+Índices, agenda dos boxes e cache de listagens são do processo. Antes de
+usá-los, o maior rowid de cada tabela é comparado com o último visto: se
+outro processo (ou outra instância) inseriu no mesmo arquivo, tudo isso é
+descartado e remontado.
+
+O histórico de serviços vem da tabela ``servicos``, uma visão desnormalizada
+(agendamento + veículo + cliente) mantida por triggers: cada inserção acrescenta
+ou corrige só as linhas afetadas, e o filtro por período é uma busca no
+índice por data.
+
+As listagens grandes (clientes, veículos, histórico) são paginadas no banco:
+uma ``Listagem`` descreve a consulta e ``pagina`` devolve só a fatia pedida,
+já ordenada, como tabela Arrow. Páginas e totais ficam num cache LRU; um
+cadastro feito por este processo descarta só as páginas e os totais das
+tabelas que mudaram.
+
+A ocupação dos boxes nos próximos meses fica em memória (``scheduler``),
+montada a partir dos agendamentos futuros e atualizada por ``add_agendamento``,
+que recusa horários sem box livre.
+
+Variável de ambiente: ``PYTHON_AG_DB_PATH`` (padrão: ``.cache/repair_shop.sqlite3``).
+"""
+import os
+import queue
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from python_ag.data_source import REPO_DIR, load_datasets
+from python_ag.paging import TAMANHO_PAGINA
+from python_ag.scheduler import HORIZONTE_DIAS, STATUS_LIVRES, WorkshopSchedule
+from python_ag.search_index import NgramIndex, PrefixIndex
+
+DB_PATH = Path(os.environ.get("PYTHON_AG_DB_PATH", REPO_DIR / ".cache" / "repair_shop.sqlite3"))
+POOL_SIZE = 8
+# Páginas e totais guardados no cache de listagens
+LIMITE_CACHE = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clientes (
+    id_cliente INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    cpf TEXT,
+    telefone TEXT,
+    email TEXT,
+    data_nascimento TEXT,
+    sexo TEXT,
+    endereco TEXT,
+    numero TEXT,
+    bairro TEXT,
+    cep TEXT,
+    cidade TEXT,
+    estado TEXT
+);
+CREATE TABLE IF NOT EXISTS veiculos (
+    id_veiculo INTEGER PRIMARY KEY,
+    id_cliente INTEGER REFERENCES clientes (id_cliente),
+    placa TEXT,
+    marca TEXT,
+    modelo TEXT,
+    ano INTEGER,
+    cor TEXT
+);
+CREATE TABLE IF NOT EXISTS agendamentos (
+    id_agendamento INTEGER PRIMARY KEY,
+    id_veiculo INTEGER REFERENCES veiculos (id_veiculo),
+    data_agendamento TEXT,
+    horario_agendamento TEXT,
+    tipo_servico TEXT,
+    valor REAL NOT NULL DEFAULT 0,
+    observacoes TEXT NOT NULL DEFAULT '',
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_veiculos_id_cliente ON veiculos (id_cliente);
+CREATE INDEX IF NOT EXISTS idx_veiculos_placa ON veiculos (placa);
+CREATE INDEX IF NOT EXISTS idx_agendamentos_id_veiculo ON agendamentos (id_veiculo);
+-- Agenda por data: o índice composto já entrega o dia ordenado por horário
+CREATE INDEX IF NOT EXISTS idx_agendamentos_data_horario ON agendamentos (data_agendamento, horario_agendamento);
+
+-- Sem rowid e com a data na frente da chave: as linhas ficam gravadas em
+-- ordem de data, e um período é lido como uma faixa contínua da árvore
+CREATE TABLE IF NOT EXISTS servicos (
+    id_agendamento INTEGER NOT NULL,
+    data_agendamento TEXT NOT NULL,  -- '' quando não há data
+    horario_agendamento TEXT,
+    id_veiculo INTEGER,
+    id_cliente INTEGER,
+    nome TEXT,
+    marca TEXT,
+    modelo TEXT,
+    placa TEXT,
+    tipo_servico TEXT,
+    valor REAL,
+    status TEXT,
+    observacoes TEXT,
+    PRIMARY KEY (data_agendamento, id_agendamento)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_servicos_id ON servicos (id_agendamento);
+CREATE INDEX IF NOT EXISTS idx_servicos_id_veiculo ON servicos (id_veiculo);
+CREATE INDEX IF NOT EXISTS idx_servicos_id_cliente ON servicos (id_cliente);
+
+CREATE TRIGGER IF NOT EXISTS servicos_novo_agendamento AFTER INSERT ON agendamentos BEGIN
+    INSERT INTO servicos
+    SELECT NEW.id_agendamento, COALESCE(NEW.data_agendamento, ''), NEW.horario_agendamento, NEW.id_veiculo,
+           v.id_cliente, c.nome, v.marca, v.modelo, v.placa, NEW.tipo_servico, NEW.valor,
+           NEW.status, NEW.observacoes
+    FROM (SELECT 1)
+    LEFT JOIN veiculos v ON v.id_veiculo = NEW.id_veiculo
+    LEFT JOIN clientes c ON c.id_cliente = v.id_cliente;
+END;
+-- Veículo ou cliente cadastrado depois do agendamento completa as linhas já existentes
+CREATE TRIGGER IF NOT EXISTS servicos_novo_veiculo AFTER INSERT ON veiculos BEGIN
+    UPDATE servicos
+    SET id_cliente = NEW.id_cliente, marca = NEW.marca, modelo = NEW.modelo, placa = NEW.placa,
+        nome = (SELECT nome FROM clientes WHERE id_cliente = NEW.id_cliente)
+    WHERE id_veiculo = NEW.id_veiculo;
+END;
+CREATE TRIGGER IF NOT EXISTS servicos_novo_cliente AFTER INSERT ON clientes BEGIN
+    UPDATE servicos SET nome = NEW.nome WHERE id_cliente = NEW.id_cliente;
+END;
+"""
+
+COLUNAS = {
+    "clientes": ["id_cliente", "nome", "cpf", "telefone", "email", "data_nascimento", "sexo",
+                 "endereco", "numero", "bairro", "cep", "cidade", "estado"],
+    "veiculos": ["id_veiculo", "id_cliente", "placa", "marca", "modelo", "ano", "cor"],
+    "agendamentos": ["id_agendamento", "id_veiculo", "data_agendamento", "horario_agendamento",
+                     "tipo_servico", "valor", "observacoes", "status"],
+}
+TABELAS = (*COLUNAS, "servicos")
+# Tabelas temporárias (por conexão) com os IDs encontrados por uma busca
+BUSCAS = ("busca_clientes", "busca_veiculos")
+# Maior rowid de cada tabela com cadastro: muda a cada inserção, de qualquer
+# processo, e sai do fim da árvore de cada tabela (não percorre as linhas)
+CARIMBO = "SELECT " + ", ".join(f"(SELECT MAX(rowid) FROM {tabela})" for tabela in COLUNAS)
+
+
+def _iso(valor):
+    """Datas são gravadas como texto ISO (AAAA-MM-DD), que ordena como data."""
+    if valor is None or pd.isna(valor):
+        return None
+    return pd.Timestamp(valor).date().isoformat()
+
+
+def _horario(valor):
+    """Horários são gravados como texto HH:MM:SS, o formato dos CSVs, que ordena como horário."""
+    if valor is None or pd.isna(valor):
+        return None
+    if not isinstance(valor, time):
+        valor = time.fromisoformat(str(valor).strip())
+    return valor.strftime("%H:%M:%S")
+
+
+def _digitos(valores):
+    return pd.Series(valores, dtype=object).fillna("").astype(str).str.replace(r"\D", "", regex=True)
+
+
+def _termo_cpf(termo):
+    """Dígitos do termo, se ele puder ser o começo de um CPF."""
+    return re.sub(r"\D", "", termo) if re.fullmatch(r"[\d.\-/ ]+", termo) else ""
+
+
+def _datas(df, col="data_agendamento"):
+    """Datas ISO do banco como coluna date32 (Arrow), sem objetos ``date`` por linha."""
+    if col in df.columns:
+        df[col] = pd.to_datetime(df[col], format="%Y-%m-%d", errors="coerce").astype("date32[pyarrow]")
+    return df
+
+
+@dataclass(frozen=True)
+class Listagem:
+    """``SELECT colunas FROM origem`` paginável.
+
+    ``ordenaveis`` são as colunas do resultado aceitas em ``ORDER BY``;
+    ``chave`` (única por linha) desempata a ordenação, para que as páginas
+    não repitam nem pulem linhas. ``datas`` são colunas ISO convertidas para
+    date32. ``contagem`` é um FROM mais barato com o mesmo número de linhas,
+    usado no total (ex.: sem os LEFT JOINs).
+
+    ``termo`` é a busca da listagem: a origem lê os IDs encontrados das
+    tabelas temporárias ``BUSCAS``, preenchidas na própria conexão antes da
+    consulta. Assim a chave do cache é o texto da consulta, e não a lista de
+    IDs.
+    """
+    colunas: str
+    origem: str
+    params: tuple = ()
+    chave: str = "rowid"
+    ordenaveis: tuple = ()
+    datas: tuple = ()
+    contagem: str = ""
+    termo: str = ""
+
+    def tabelas(self):
+        """Tabelas do banco lidas pela listagem."""
+        return set(re.findall(rf"\b({'|'.join(TABELAS)})\b", self.origem))
+
+    def sql(self, ordem=None, decrescente=False):
+        if ordem is not None and ordem not in self.ordenaveis:
+            raise ValueError(f"Coluna de ordenação inválida: {ordem}")
+        direcao = "DESC" if decrescente else "ASC"
+        termos = [f'"{ordem}" {direcao}'] if ordem else []
+        termos += [f"{c.strip()} {direcao}" for c in self.chave.split(",")]
+        return f"SELECT {self.colunas} FROM {self.origem} ORDER BY {', '.join(termos)}"
+
+
+def load_seed_data(source=None):
+    """Clientes, veículos e agendamentos dos CSVs (lidos em paralelo), para popular um banco vazio."""
+    return tuple(load_datasets(("clientes", "veiculos", "agendamentos"), source=source).values())
+
+
+class RepairShopDB:
+    def __init__(self, path=DB_PATH, pool_size=POOL_SIZE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._busca = None
+        self._lock_busca = threading.Lock()
+        self._oficina = None
+        self._lock_oficina = threading.Lock()
+        self._cache = OrderedDict()
+        self._versao = 0
+        self._lock_cache = threading.Lock()
+        self._carimbo = None
+        self._lock_carimbo = threading.Lock()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+            self._carimbo = conn.execute(CARIMBO).fetchone()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Empresta uma conexão do pool; a transação é confirmada ao sair."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def query(self, sql, params=()):
+        with self.connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def scalar(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def is_empty(self):
+        return self.scalar("SELECT COUNT(*) FROM clientes") == 0
+
+    # Escritas de outros processos
+
+    def _sincronizar(self):
+        """Descarta índices de busca, agenda e cache se outro processo gravou no banco.
+
+        Compara o carimbo (``CARIMBO``) com o último visto; os cadastros
+        deste processo avançam o carimbo em ``_registrar`` e não contam.
+        """
+        with self.connection() as conn:
+            carimbo = conn.execute(CARIMBO).fetchone()
+        with self._lock_carimbo:
+            if carimbo == self._carimbo:
+                return
+            self._carimbo = carimbo
+        self._invalidar()
+        with self._lock_busca:
+            self._busca = None
+        with self._lock_oficina:
+            self._oficina = None
+
+    def _registrar(self, tabela, rowid):
+        """Avança o carimbo com um cadastro deste processo.
+
+        Só quando ``rowid`` é o seguinte ao carimbo: se outro processo (ou
+        outra thread) inseriu no meio, o carimbo fica para trás e o próximo
+        ``_sincronizar`` refaz tudo.
+        """
+        i = list(COLUNAS).index(tabela)
+        with self._lock_carimbo:
+            if (self._carimbo[i] or 0) == rowid - 1:
+                self._carimbo = (*self._carimbo[:i], rowid, *self._carimbo[i + 1:])
+
+    # Cache das listagens
+
+    def _invalidar(self, alteradas=None):
+        """Descarta do cache o que depende das tabelas ``alteradas`` (None descarta tudo).
+
+        Totais são descartados e recontados, não corrigidos: entre o commit e
+        esta chamada, outra sessão pode ter contado e guardado um total que
+        já inclui a linha nova.
+        """
+        with self._lock_cache:
+            self._versao += 1
+            if alteradas is None:
+                self._cache.clear()
+                return
+            for chave in list(self._cache):
+                if chave[1].tabelas() & alteradas:
+                    del self._cache[chave]
+
+    def _em_cache(self, chave, calcular):
+        self._sincronizar()
+        with self._lock_cache:
+            if chave in self._cache:
+                self._cache.move_to_end(chave)
+                return self._cache[chave]
+            versao = self._versao
+        valor = calcular()
+        with self._lock_cache:
+            # Uma escrita no meio do cálculo deixaria o valor velho no cache
+            if versao == self._versao:
+                self._cache[chave] = valor
+                if len(self._cache) > LIMITE_CACHE:
+                    self._cache.popitem(last=False)
+        return valor
+
+    def _preencher_buscas(self, conn, termo):
+        """Grava em ``BUSCAS`` os IDs encontrados por ``termo``, nesta conexão."""
+        ids = {"busca_clientes": self._buscar_ids_clientes(termo),
+               "busca_veiculos": self._indices_busca()["placa"].search(termo)}
+        for tabela in BUSCAS:
+            conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {tabela} (id INTEGER PRIMARY KEY)")
+            conn.execute(f"DELETE FROM {tabela}")
+            conn.executemany(f"INSERT INTO {tabela} VALUES (?)", ((int(i),) for i in ids[tabela]))
+
+    def _consultar(self, listagem, sql, params=()):
+        with self.connection() as conn:
+            if listagem.termo:
+                self._preencher_buscas(conn, listagem.termo)
+            return pd.read_sql_query(sql, conn, params=(*listagem.params, *params))
+
+    def listar(self, listagem, ordem=None, decrescente=False):
+        """Todas as linhas da listagem, como DataFrame."""
+        df = self._consultar(listagem, listagem.sql(ordem, decrescente))
+        for col in listagem.datas:
+            _datas(df, col)
+        return df
+
+    def pagina(self, listagem, ordem=None, decrescente=False, pagina=0, tamanho=TAMANHO_PAGINA):
+        """Página ``pagina`` (a partir de 0) da listagem, como tabela Arrow."""
+        def calcular():
+            df = self._consultar(listagem, f"{listagem.sql(ordem, decrescente)} LIMIT ? OFFSET ?",
+                                 (tamanho, pagina * tamanho))
+            for col in listagem.datas:
+                _datas(df, col)
+            return pa.Table.from_pandas(df, preserve_index=False)
+
+        return self._em_cache(("pagina", listagem, ordem, decrescente, pagina, tamanho), calcular)
+
+    def total(self, listagem):
+        """Número de linhas da listagem."""
+        return self._em_cache(
+            ("total", listagem),
+            lambda: int(self._consultar(
+                listagem, f"SELECT COUNT(*) FROM {listagem.contagem or listagem.origem}").iat[0, 0]),
+        )
+
+    def seed(self, clientes_df, veiculos_df, agendamentos_df):
+        """Carrega os CSVs iniciais, só se o banco ainda estiver vazio."""
+        if not self.is_empty():
+            return
+        self._invalidar()
+        agendamentos_df = agendamentos_df.copy()
+        agendamentos_df["data_agendamento"] = agendamentos_df["data_agendamento"].map(_iso)
+        if "valor" in agendamentos_df.columns:
+            agendamentos_df["valor"] = agendamentos_df["valor"].fillna(0.0)
+        with self.connection() as conn:
+            for tabela, df in (("clientes", clientes_df), ("veiculos", veiculos_df),
+                               ("agendamentos", agendamentos_df)):
+                colunas = [c for c in COLUNAS[tabela] if c in df.columns]
+                linhas = df[colunas].astype(object).where(df[colunas].notna(), None)
+                conn.executemany(
+                    f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})",
+                    linhas.itertuples(index=False, name=None),
+                )
+
+    # Cadastros
+
+    def add_cliente(self, nome, cpf, telefone):
+        with self.connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO clientes (nome, cpf, telefone) VALUES (?, ?, ?)", (nome, cpf, telefone)
+            )
+        id_cliente = cursor.lastrowid
+        self._registrar("clientes", id_cliente)
+        # As triggers completam o nome em ``servicos``
+        self._invalidar({"clientes", "veiculos", "servicos"})
+        with self._lock_busca:
+            if self._busca is not None:
+                self._busca["nome"].add(id_cliente, nome)
+                self._busca["cpf"].add(id_cliente, re.sub(r"\D", "", str(cpf or "")))
+        return id_cliente
+
+    def add_veiculo(self, id_cliente, placa, marca, modelo):
+        with self.connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO veiculos (id_cliente, placa, marca, modelo) VALUES (?, ?, ?, ?)",
+                (int(id_cliente), placa.upper(), marca, modelo),
+            )
+        id_veiculo = cursor.lastrowid
+        self._registrar("veiculos", id_veiculo)
+        self._invalidar({"veiculos", "servicos"})
+        with self._lock_busca:
+            if self._busca is not None:
+                self._busca["placa"].add(id_veiculo, placa.upper())
+        return id_veiculo
+
+    def add_agendamento(self, id_veiculo, data, horario, tipo_servico, valor, observacoes, status="Confirmado"):
+        """Grava o agendamento (horário como HH:MM:SS); dentro do horizonte da agenda, reserva um box antes.
+
+        Levanta ValueError se nenhum box comporta o serviço no horário. Se a
+        gravação falhar, o box reservado é liberado.
+        """
+        oficina, box = self.agenda_oficina(), None
+        if str(status).lower() not in STATUS_LIVRES and oficina.covers(data):
+            with self._lock_oficina:
+                box = oficina.book(data, horario, tipo_servico)
+        try:
+            with self.connection() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO agendamentos (id_veiculo, data_agendamento, horario_agendamento, "
+                    "tipo_servico, valor, observacoes, status) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        int(id_veiculo) if pd.notna(id_veiculo) else None,
+                        _iso(data),
+                        _horario(horario),
+                        tipo_servico,
+                        float(valor) if valor else 0.0,
+                        str(observacoes) if observacoes else "",
+                        status,
+                    ),
+                )
+        except Exception:
+            if box is not None:
+                with self._lock_oficina:
+                    oficina.release(data, horario, tipo_servico, box)
+            raise
+        self._registrar("agendamentos", cursor.lastrowid)
+        self._invalidar({"agendamentos", "servicos"})
+        return cursor.lastrowid
+
+    def agenda_oficina(self):
+        """Ocupação dos boxes de hoje até ``HORIZONTE_DIAS``; remontada quando o dia vira."""
+        hoje = date.today()
+        self._sincronizar()
+        with self._lock_oficina:
+            if self._oficina is None or self._oficina.inicio != hoje:
+                futuros = self.query(
+                    "SELECT data_agendamento, horario_agendamento, tipo_servico, status "
+                    "FROM agendamentos WHERE data_agendamento >= ? AND data_agendamento < ?",
+                    (hoje.isoformat(), (hoje + timedelta(days=HORIZONTE_DIAS)).isoformat()),
+                )
+                self._oficina = WorkshopSchedule.from_agendamentos(futuros, hoje)
+            return self._oficina
+
+    # Consultas
+
+    def agenda(self, dia):
+        """Agendamentos de um dia, com veículo e cliente, ordenados por horário.
+
+        Lê só a faixa do dia no índice ``(data_agendamento, horario_agendamento)``
+        e busca veículo e cliente pela chave primária, então o custo depende
+        dos agendamentos do dia e não do tamanho do histórico.
+        """
+        return self.query(
+            """
+            SELECT a.id_agendamento, a.horario_agendamento, c.nome, v.marca, v.modelo,
+                   a.tipo_servico, a.status
+            FROM agendamentos a
+            LEFT JOIN veiculos v ON v.id_veiculo = a.id_veiculo
+            LEFT JOIN clientes c ON c.id_cliente = v.id_cliente
+            WHERE a.data_agendamento = ?
+            ORDER BY a.horario_agendamento
+            """,
+            (_iso(dia),),
+        )
+
+    def listagem_clientes(self, termo=None):
+        """Clientes; com ``termo``, os que têm o nome contendo ou o CPF começando com ele."""
+        filtro = "WHERE id_cliente IN (SELECT id FROM busca_clientes)" if termo else ""
+        return Listagem("*", f"clientes {filtro}", chave="id_cliente",
+                        ordenaveis=tuple(COLUNAS["clientes"]), termo=termo or "")
+
+    def clientes(self):
+        return self.listar(self.listagem_clientes())
+
+    def _indices_busca(self):
+        """Índices de nome, CPF e placa; montados na primeira busca e refeitos após escritas de outro processo."""
+        self._sincronizar()
+        with self._lock_busca:
+            if self._busca is None:
+                clientes = self.query("SELECT id_cliente, nome, cpf FROM clientes ORDER BY id_cliente")
+                veiculos = self.query("SELECT id_veiculo, placa FROM veiculos ORDER BY id_veiculo")
+                self._busca = {
+                    "nome": NgramIndex(clientes["id_cliente"], clientes["nome"]),
+                    "cpf": PrefixIndex(clientes["id_cliente"], _digitos(clientes["cpf"])),
+                    "placa": NgramIndex(veiculos["id_veiculo"], veiculos["placa"]),
+                }
+            return self._busca
+
+    def _buscar_ids_clientes(self, termo):
+        busca = self._indices_busca()
+        ids = busca["nome"].search(termo)
+        digitos = _termo_cpf(termo)
+        return np.union1d(ids, busca["cpf"].search(digitos)) if digitos else ids
+
+    def buscar_clientes(self, termo):
+        """Clientes cujo nome contém ``termo`` ou cujo CPF começa com ele."""
+        return self.listar(self.listagem_clientes(termo))
+
+    def cliente_por_nome(self, nome):
+        return self.query("SELECT * FROM clientes WHERE nome = ? ORDER BY id_cliente", (nome,))
+
+    def nomes_clientes(self):
+        return self.query("SELECT DISTINCT nome FROM clientes ORDER BY nome")["nome"]
+
+    def veiculos_do_cliente(self, id_cliente):
+        return self.query("SELECT * FROM veiculos WHERE id_cliente = ? ORDER BY id_veiculo", (int(id_cliente),))
+
+    def listagem_veiculos(self, termo=None):
+        """Veículos com nome e CPF do dono; ``termo`` busca em nome, CPF e placa."""
+        filtro = ("WHERE v.id_cliente IN (SELECT id FROM busca_clientes) "
+                  "OR v.id_veiculo IN (SELECT id FROM busca_veiculos)") if termo else ""
+        return Listagem(
+            "v.placa AS placa, v.marca AS marca, v.modelo AS modelo, c.nome AS nome, c.cpf AS cpf",
+            f"veiculos v LEFT JOIN clientes c ON c.id_cliente = v.id_cliente {filtro}",
+            chave="v.id_veiculo", ordenaveis=("placa", "marca", "modelo", "nome", "cpf"),
+            contagem=f"veiculos v {filtro}", termo=termo or "",
+        )
+
+    def veiculos_com_clientes(self, termo=None):
+        return self.listar(self.listagem_veiculos(termo))
+
+    def periodo_servicos(self):
+        """Primeira e última data com agendamento (ou None, None)."""
+        with self.connection() as conn:
+            inicio, fim = conn.execute(
+                "SELECT MIN(data_agendamento), MAX(data_agendamento) FROM agendamentos"
+            ).fetchone()
+        return (date.fromisoformat(inicio) if inicio else None,
+                date.fromisoformat(fim) if fim else None)
+
+    def listagem_servicos(self, inicio=None, fim=None):
+        """Histórico de serviços com veículo e cliente, opcionalmente por período.
+
+        A ordem padrão (data, agendamento) é a da chave primária de
+        ``servicos``, então as páginas saem sem ordenar o período inteiro.
+        """
+        filtro, params = "", ()
+        if inicio is not None and fim is not None:
+            filtro, params = "WHERE data_agendamento BETWEEN ? AND ?", (_iso(inicio), _iso(fim))
+        colunas = ("id_agendamento", "data_agendamento", "horario_agendamento", "nome", "marca", "modelo",
+                   "placa", "tipo_servico", "valor", "status", "observacoes")
+        return Listagem(", ".join(colunas), f"servicos {filtro}", params,
+                        chave="data_agendamento, id_agendamento", ordenaveis=colunas,
+                        datas=("data_agendamento",))
+
+    def servicos(self, inicio=None, fim=None):
+        return self.listar(self.listagem_servicos(inicio, fim))
+
+    def resumo_financeiro(self):
+        """Receita prevista, realizada (confirmados) e média por serviço."""
+        with self.connection() as conn:
+            previsto, realizado, medio = conn.execute(
+                """
+                SELECT COALESCE(SUM(valor), 0),
+                       COALESCE(SUM(CASE WHEN LOWER(status) = 'confirmado' THEN valor END), 0),
+                       COALESCE(AVG(valor), 0)
+                FROM agendamentos
+                """
+            ).fetchone()
+        return previsto, realizado, medio
+
+    def contagem(self, tabela, coluna):
+        """Contagem por valor de uma coluna, da mais para a menos frequente."""
+        if coluna not in COLUNAS[tabela]:
+            raise ValueError(f"Coluna inválida: {coluna}")
+        df = self.query(
+            f"SELECT {coluna}, COUNT(*) AS count FROM {tabela} "
+            f"WHERE {coluna} IS NOT NULL GROUP BY {coluna} ORDER BY count DESC"
+        )
+        return df.set_index(coluna)["count"]
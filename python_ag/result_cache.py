@@ -0,0 +1,130 @@
+"""Cache de resultados de agregação por combinação de filtros.
+
+Muitos usuários escolhem as mesmas combinações de filtros (ex.: o padrão da
+Python Parts), e o resultado só depende do dataset e dos filtros. Este cache
+é único por processo e guarda cada resultado sob a chave
+``(dataset, versão, filtros normalizados)``:
+
+- a memória ocupada é estimada por resultado e limitada por
+  ``PYTHON_AG_RESULT_CACHE_MB`` (padrão: 64); ao passar do limite saem os
+  usados há mais tempo (LRU);
+- quando um dataset aparece com outra versão (foi recarregado de uma fonte
+  que mudou), todos os resultados da versão anterior são descartados;
+- ``stats`` conta acertos, faltas e descartes.
+
+Os resultados são compartilhados entre sessões e não devem ser alterados
+por quem os recebe.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_MB = float(os.environ.get("PYTHON_AG_RESULT_CACHE_MB", 64))
+
+
+def normalize_filters(filtros):
+    """Filtros (coluna -> valores) como tupla ordenada, independente da ordem de seleção."""
+    return tuple(sorted(
+        (str(col), tuple(sorted({str(v) for v in valores})))
+        for col, valores in filtros.items()
+    ))
+
+
+def _tamanho(valor):
+    """Bytes aproximados de um resultado (DataFrames, Series, arrays e coleções deles)."""
+    if isinstance(valor, (pd.DataFrame, pd.Series, pd.Index)):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum()) if isinstance(uso, pd.Series) else int(uso)
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(_tamanho(k) + _tamanho(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(_tamanho(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class ResultCache:
+    def __init__(self, max_mb=MAX_MB):
+        self.max_bytes = int(max_mb * 2 ** 20)
+        self._lock = threading.Lock()
+        self._itens = OrderedDict()
+        self._versoes = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remover(self, chave):
+        _, tamanho = self._itens.pop(chave)
+        self.bytes -= tamanho
+
+    def _invalidar(self, dataset):
+        for chave in [c for c in self._itens if c[0] == dataset]:
+            self._remover(chave)
+            self.invalidations += 1
+
+    def get_or_compute(self, dataset, versao, filtros, calcular):
+        """Resultado de ``calcular()`` para os filtros, calculado uma vez por versão do dataset."""
+        chave = (dataset, versao, normalize_filters(filtros))
+        with self._lock:
+            if self._versoes.get(dataset, versao) != versao:
+                self._invalidar(dataset)
+            self._versoes[dataset] = versao
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.hits += 1
+                return self._itens[chave][0]
+            self.misses += 1
+
+        resultado = calcular()
+        tamanho = _tamanho(resultado)
+        with self._lock:
+            # Resultados maiores que o cache inteiro não são guardados, e um
+            # recarregamento no meio do cálculo torna este resultado velho
+            if tamanho > self.max_bytes or self._versoes.get(dataset) != versao or chave in self._itens:
+                return resultado
+            self._itens[chave] = (resultado, tamanho)
+            self.bytes += tamanho
+            while self.bytes > self.max_bytes:
+                self._remover(next(iter(self._itens)))
+                self.evictions += 1
+        return resultado
+
+    def clear(self):
+        with self._lock:
+            self._itens.clear()
+            self._versoes.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "itens": len(self._itens),
+                "mb": self.bytes / 2 ** 20,
+                "limite_mb": self.max_bytes / 2 ** 20,
+                "acertos": self.hits,
+                "faltas": self.misses,
+                "taxa_acerto": self.hits / consultas if consultas else 0.0,
+                "descartes_lru": self.evictions,
+                "invalidados": self.invalidations,
+            }
+
+
+_cache = None
+_lock_cache = threading.Lock()
+
+
+def shared_cache():
+    """O cache do processo, criado no primeiro uso."""
+    global _cache
+    with _lock_cache:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
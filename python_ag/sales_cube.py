@@ -0,0 +1,154 @@
+"""Cubo pré-agregado das vendas de acessórios (Python Parts).
+
+As vendas são somadas uma única vez por mês × região × canal × produto. Os
+filtros da sidebar e os gráficos são respondidos a partir dessas células, então
+o custo de cada interação depende do número de combinações distintas e não
+do número de vendas.
+
+``SalesCube.from_batches`` monta o cubo em modo streaming: cada bloco de
+vendas ganha as colunas derivadas, é agregado e somado ao acumulado, então a
+memória fica limitada ao tamanho do bloco mais o número de células. Para
+conferir o pico de memória do processo com um arquivo grande (o mesmo caminho
+da página, ``from_dataset``) contra a margem da ingestão::
+
+    python -m python_ag.sales_cube pasta_com_o_csv/ --max-memory-mb 256
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from python_ag import data_source
+from python_ag.compact import concat
+
+DIMENSOES = ("mes", "regiao", "canal_venda", "produto_nome")
+MEDIDAS = ("receita", "lucro", "quantidade")
+
+
+def prepare_sales(df):
+    """Colunas derivadas das vendas: receita, lucro e mês (AAAA-MM)."""
+    df["receita"] = df["quantidade"] * df["preco_unitario"]
+    df["lucro"] = df["receita"] - (df["quantidade"] * df["custo_unitario"])
+    df["mes"] = df["data_venda"].dt.to_period("M").astype(str)
+    return df
+
+
+def aggregate_sales(df):
+    """Soma as medidas por célula do cubo."""
+    return (
+        df.groupby(list(DIMENSOES), observed=True, sort=True)[list(MEDIDAS)]
+        .sum()
+        .reset_index()
+    )
+
+
+class SalesCube:
+    def __init__(self, agregado):
+        """Recebe as células já agregadas (ver ``aggregate_sales``)."""
+        self.n_celulas = len(agregado)
+        # Identificador dos dados de origem, quando vêm do espelho
+        self.version = None
+        self._valores = {}
+        self._codigos = {}
+        for dim in DIMENSOES:
+            codigos, valores = pd.factorize(agregado[dim], sort=True)
+            self._codigos[dim] = codigos
+            self._valores[dim] = pd.Index(valores, name=dim)
+        self._medidas = {m: agregado[m].to_numpy(dtype=np.float64) for m in MEDIDAS}
+
+    @classmethod
+    def from_sales(cls, df):
+        """Cubo a partir das vendas já com receita, lucro e mês."""
+        return cls(aggregate_sales(df))
+
+    @classmethod
+    def from_batches(cls, blocos):
+        """Cubo a partir de blocos de vendas brutas, sem juntá-los em memória."""
+        agregado = None
+        for bloco in blocos:
+            parcial = aggregate_sales(prepare_sales(bloco))
+            if agregado is not None:
+                # Cada bloco tem as próprias categorias; ``concat`` as une sem virar texto
+                parcial = aggregate_sales(concat([agregado, parcial]))
+            agregado = parcial
+        if agregado is None:
+            agregado = pd.DataFrame(columns=list(DIMENSOES + MEDIDAS))
+        return cls(agregado)
+
+    @classmethod
+    def from_dataset(cls, name="vendas_acessorios_fake", source=None):
+        """Cubo a partir do espelho local, lido um record batch por vez."""
+        colunas = ["data_venda", "regiao", "canal_venda", "produto_nome",
+                   "quantidade", "preco_unitario", "custo_unitario"]
+        cubo = cls.from_batches(data_source.iter_dataset(name, columns=colunas, source=source))
+        cubo.version = data_source.dataset_version(name)
+        return cubo
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos códigos e medidas das células."""
+        return sum(a.nbytes for a in [*self._codigos.values(), *self._medidas.values()])
+
+    def values(self, dim):
+        """Valores distintos (ordenados) de uma dimensão."""
+        return self._valores[dim]
+
+    def _mascara(self, filtros):
+        """Células que passam nos filtros (dimensão -> valores aceitos)."""
+        mascara = np.ones(self.n_celulas, dtype=bool)
+        for dim, valores in filtros.items():
+            aceitos = np.zeros(len(self._valores[dim]), dtype=bool)
+            codigos = self._valores[dim].get_indexer(list(valores))
+            aceitos[codigos[codigos >= 0]] = True
+            mascara &= aceitos[self._codigos[dim]]
+        return mascara
+
+    def totals(self, filtros):
+        """Soma de cada medida nas células filtradas."""
+        mascara = self._mascara(filtros)
+        return pd.Series({m: self._medidas[m][mascara].sum() for m in MEDIDAS})
+
+    def group_sum(self, dim, medida, filtros):
+        """Soma de ``medida`` por valor de ``dim`` nas células filtradas.
+
+        Como um ``groupby(dim)[medida].sum()``, só aparecem valores com ao
+        menos uma célula no filtro.
+        """
+        mascara = self._mascara(filtros)
+        codigos = self._codigos[dim][mascara]
+        n = len(self._valores[dim])
+        soma = np.bincount(codigos, weights=self._medidas[medida][mascara], minlength=n)
+        presente = np.bincount(codigos, minlength=n) > 0
+        return pd.Series(soma[presente], index=self._valores[dim][presente], name=medida)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m python_ag.sales_cube",
+        description="Monta o cubo como a página (CSV -> espelho -> blocos) e confere o pico de memória.",
+    )
+    parser.add_argument("fonte", help="diretório com o vendas_acessorios_fake.csv")
+    parser.add_argument("--max-memory-mb", type=int, default=data_source.MAX_MEMORY_MB,
+                        help="margem de memória da ingestão, além da que o processo já usa")
+    args = parser.parse_args(argv)
+
+    # Espelho novo num diretório temporário: mede a ingestão do CSV e a leitura em blocos
+    data_source.MAX_MEMORY_MB = args.max_memory_mb
+    base = data_source.resident_mb()
+    with tempfile.TemporaryDirectory() as espelho:
+        data_source.MIRROR_DIR = Path(espelho)
+        cubo = SalesCube.from_dataset("vendas_acessorios_fake", source=args.fonte)
+        caminho, _ = data_source._mirror_paths(data_source.DATASETS["vendas_acessorios_fake"])
+        blocos = pa.ipc.open_file(str(caminho)).num_record_batches
+    pico = data_source.peak_rss_mb()
+    print(f"{cubo.n_celulas} células em {blocos} blocos | pico de memória do processo: {pico:.0f} MB, "
+          f"{base:.0f} MB antes da ingestão (margem: {args.max_memory_mb} MB)")
+    return 0 if pico - base <= args.max_memory_mb else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
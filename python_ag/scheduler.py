@@ -0,0 +1,185 @@
+"""Ocupação dos boxes da oficina em bitsets, para vários dias à frente.
+
+Cada dia × box é um inteiro de 64 bits em que o bit ``i`` indica o horário
+``i`` ocupado (horários de ``SLOT_MINUTOS`` a partir de ``ABERTURA``). Um
+serviço que dura ``k`` horários cabe onde há ``k`` bits livres seguidos, o
+que se descobre com ``k`` deslocamentos e ``&`` sobre o array inteiro:
+
+    inicios = livre & (livre >> 1) & ... & (livre >> (k - 1))
+
+Assim "próximo horário livre para um serviço de 2 horas" e "capacidade livre
+por dia nos próximos 90 dias" são operações vetorizadas sobre poucos
+kilobytes, sem percorrer agendamentos.
+
+Variável de ambiente: ``PYTHON_AG_BOXES`` (número de boxes, padrão: 3).
+"""
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+BOXES = int(os.environ.get("PYTHON_AG_BOXES", 3))
+ABERTURA = 8
+FECHAMENTO = 18
+SLOT_MINUTOS = 60
+HORIZONTE_DIAS = 180
+# Duração de cada serviço, em horários
+DURACAO_SERVICO = {
+    "Troca de óleo": 1,
+    "Revisão periódica": 3,
+    "Alinhamento": 1,
+    "Balanceamento": 1,
+    "Freios": 2,
+    "Suspensão": 3,
+}
+STATUS_LIVRES = ("cancelado",)
+# Bits ligados de cada byte, para contar bits sem ``np.bitwise_count``
+_BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(valores):
+    """Bits ligados de cada elemento uint64 (``np.bitwise_count`` só existe a partir do NumPy 2)."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(valores)
+    por_byte = np.ascontiguousarray(valores).view(np.uint8).reshape(*valores.shape, 8)
+    return _BITS_POR_BYTE[por_byte].sum(axis=-1, dtype=np.uint8)
+
+
+def _menor_bit(valor):
+    valor = int(valor)
+    return (valor & -valor).bit_length() - 1
+
+
+class WorkshopSchedule:
+    def __init__(self, inicio=None, dias=HORIZONTE_DIAS, boxes=BOXES,
+                 abertura=ABERTURA, fechamento=FECHAMENTO, slot_minutos=SLOT_MINUTOS):
+        self.inicio = inicio or date.today()
+        self.dias = dias
+        self.boxes = boxes
+        self.abertura = abertura
+        self.slot_minutos = slot_minutos
+        self.n_slots = (fechamento - abertura) * 60 // slot_minutos
+        if not 0 < self.n_slots <= 64:
+            raise ValueError("O expediente precisa ter entre 1 e 64 horários por dia.")
+        self._cheio = np.uint64((1 << self.n_slots) - 1)
+        self._ocupado = np.zeros((dias, boxes), dtype=np.uint64)
+        # Agendamentos que não couberam em nenhum box ao carregar o histórico
+        self.conflitos = 0
+
+    @classmethod
+    def from_agendamentos(cls, agendamentos_df, inicio=None, **kwargs):
+        """Agenda a partir dos agendamentos existentes (os cancelados não ocupam box)."""
+        agenda = cls(inicio, **kwargs)
+        for dia, horario, tipo_servico, status in agendamentos_df[
+            ["data_agendamento", "horario_agendamento", "tipo_servico", "status"]
+        ].itertuples(index=False, name=None):
+            if pd.isna(dia) or pd.isna(horario) or str(status).lower() in STATUS_LIVRES:
+                continue
+            try:
+                agenda.book(dia, horario, tipo_servico)
+            except ValueError:
+                agenda.conflitos += 1
+        return agenda
+
+    # Conversões
+
+    def slot(self, horario):
+        """Índice do horário ``"HH:MM"`` (ou ``"HH:MM:SS"``) no dia."""
+        horas, minutos = str(horario).split(":")[:2]
+        slot, resto = divmod((int(horas) - self.abertura) * 60 + int(minutos), self.slot_minutos)
+        if resto or not 0 <= slot < self.n_slots:
+            raise ValueError(f"Horário fora do expediente: {horario}")
+        return slot
+
+    def horario(self, slot):
+        minutos = self.abertura * 60 + slot * self.slot_minutos
+        return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+    def horarios(self):
+        return [self.horario(s) for s in range(self.n_slots)]
+
+    def covers(self, dia):
+        """A data está dentro do horizonte da agenda?"""
+        return 0 <= (pd.Timestamp(dia).date() - self.inicio).days < self.dias
+
+    def _dia(self, dia):
+        indice = (pd.Timestamp(dia).date() - self.inicio).days
+        if not 0 <= indice < self.dias:
+            raise ValueError(f"Data fora do horizonte da agenda: {dia}")
+        return indice
+
+    def duracao(self, tipo_servico):
+        return DURACAO_SERVICO.get(tipo_servico, 1)
+
+    # Bitsets
+
+    def _inicios(self, livre, k):
+        """Bits onde começa uma sequência de ``k`` horários livres."""
+        inicios = livre.copy()
+        for j in range(1, k):
+            inicios &= livre >> np.uint64(j)
+        return inicios
+
+    def _livre(self, dias=slice(None)):
+        return ~self._ocupado[dias] & self._cheio
+
+    def fits(self, dia, horario, tipo_servico):
+        """Algum box comporta o serviço começando em ``horario``?"""
+        try:
+            d, s = self._dia(dia), self.slot(horario)
+        except ValueError:
+            return False
+        inicios = self._inicios(self._livre(d), self.duracao(tipo_servico))
+        return bool((inicios & np.uint64(1 << s)).any())
+
+    def book(self, dia, horario, tipo_servico):
+        """Ocupa o primeiro box que comporta o serviço. Retorna o box."""
+        d, s = self._dia(dia), self.slot(horario)
+        k = self.duracao(tipo_servico)
+        if s + k > self.n_slots:
+            raise ValueError(f"{tipo_servico} às {horario} termina depois do expediente.")
+        mascara = np.uint64(((1 << k) - 1) << s)
+        livres = np.flatnonzero((self._ocupado[d] & mascara) == 0)
+        if not len(livres):
+            raise ValueError(f"Nenhum box livre em {dia} às {horario} para {tipo_servico}.")
+        box = int(livres[0])
+        self._ocupado[d, box] |= mascara
+        return box
+
+    def release(self, dia, horario, tipo_servico, box):
+        """Desfaz um ``book``: libera os horários do serviço no ``box``."""
+        d, s = self._dia(dia), self.slot(horario)
+        mascara = np.uint64(((1 << self.duracao(tipo_servico)) - 1) << s)
+        self._ocupado[d, box] &= ~mascara
+
+    def free_starts(self, dia, tipo_servico=None):
+        """Horários em que o serviço (ou um horário avulso) ainda cabe no dia."""
+        inicios = self._inicios(self._livre(self._dia(dia)), self.duracao(tipo_servico))
+        bits = int(np.bitwise_or.reduce(inicios))
+        return [self.horario(s) for s in range(self.n_slots) if bits >> s & 1]
+
+    def next_free(self, tipo_servico, dia=None, horario=None):
+        """Primeiro ``(data, horário, box)`` a partir de ``dia``/``horario``, ou None."""
+        d = self._dia(dia or self.inicio)
+        s = self.slot(horario) if horario else 0
+        inicios = self._inicios(self._livre(slice(d, None)), self.duracao(tipo_servico))
+        inicios[0] &= ~np.uint64((1 << s) - 1)
+        dias_com_vaga = np.flatnonzero(inicios.any(axis=1))
+        if not len(dias_com_vaga):
+            return None
+        primeiro = dias_com_vaga[0]
+        slots = [_menor_bit(v) if v else self.n_slots for v in inicios[primeiro]]
+        box = int(np.argmin(slots))
+        return self.inicio + timedelta(days=int(d + primeiro)), self.horario(slots[box]), box
+
+    def free_slots(self, dia):
+        """Horários livres no dia, somando todos os boxes."""
+        return int(_popcount(self._livre(self._dia(dia))).sum())
+
+    def free_capacity(self, dias=90, dia=None):
+        """Horários livres por dia (todos os boxes) a partir de ``dia``."""
+        d = self._dia(dia or self.inicio)
+        livres = _popcount(self._livre(slice(d, d + dias))).sum(axis=1)
+        datas = pd.date_range(self.inicio + timedelta(days=d), periods=len(livres), freq="D")
+        return pd.Series(livres.astype(np.int64), index=datas, name="horarios_livres")
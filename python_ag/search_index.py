@@ -0,0 +1,202 @@
+"""Índices de busca em memória para os cadastros (nome, CPF, placa).
+
+``NgramIndex`` responde "contém o termo" com um índice de trigramas: cada
+texto normalizado (minúsculas, sem acentos) é quebrado em trechos de três
+caracteres e, para cada trigrama, guarda-se a lista ordenada dos textos onde
+ele aparece. Uma busca parte da lista mais curta entre os trigramas do termo
+e confere as outras por busca binária, então o custo depende de quantos
+textos têm o trigrama mais raro, não do tamanho do cadastro. Termos de um ou
+dois caracteres juntam as listas dos trigramas que os contêm.
+
+``PrefixIndex`` responde "começa com" sobre um array ordenado, com duas
+buscas binárias.
+
+Os dois aceitam inserções: os textos novos ficam numa lista pequena que é
+varrida a cada busca e incorporada ao índice principal quando passa de
+``LIMITE_PENDENTES``.
+"""
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+LIMITE_PENDENTES = 4096
+# Acima disso, a conferência do trecho inteiro é feita pelo pandas
+LIMITE_CONFERENCIA = 1000
+_BITS = 21
+_MASCARA = (1 << _BITS) - 1
+
+
+def normalizar(textos):
+    """Minúsculas e sem acentos, para uma Series de textos."""
+    return (
+        pd.Series(textos, dtype=object).fillna("").astype(str)
+        .str.normalize("NFKD")
+        .str.replace("[\u0300-\u036f]", "", regex=True)
+        .str.lower()
+    )
+
+
+def normalizar_termo(termo):
+    """Mesma normalização de ``normalizar``, para um texto só."""
+    decomposto = unicodedata.normalize("NFKD", str(termo or ""))
+    return "".join(c for c in decomposto if not "\u0300" <= c <= "\u036f").lower()
+
+
+def _code_points(texto):
+    return np.frombuffer(texto.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+
+def _trigramas(codigos):
+    """Chave inteira de cada trigrama de um array de code points (21 bits cada)."""
+    return (codigos[:-2] << 2 * _BITS) | (codigos[1:-1] << _BITS) | codigos[2:]
+
+
+class NgramIndex:
+    def __init__(self, ids, textos):
+        self._lock = threading.Lock()
+        self._montar(np.asarray(ids, dtype=np.int64), normalizar(textos).to_numpy(dtype=object))
+
+    def _montar(self, ids, textos):
+        self._ids = ids
+        self._textos = textos
+        self._pendentes_ids = []
+        self._pendentes_textos = []
+
+        # Todos os textos numa string só, separados por "\0", como code points
+        tamanhos = np.fromiter((len(t) for t in textos), dtype=np.int64, count=len(textos))
+        codigos = _code_points("\0".join(textos))
+        documento = np.repeat(np.arange(len(textos), dtype=np.int32), tamanhos + 1)[:len(codigos)]
+        if len(codigos) >= 3:
+            chaves = _trigramas(codigos)
+            validos = (codigos[:-2] != 0) & (codigos[1:-1] != 0) & (codigos[2:] != 0)
+            chaves, documento = chaves[validos], documento[:-2][validos]
+        else:
+            chaves, documento = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+
+        # Ordena por trigrama mantendo a ordem dos documentos e tira repetições
+        ordem = np.argsort(chaves, kind="stable")
+        chaves, documento = chaves[ordem], documento[ordem]
+        novo = np.ones(len(chaves), dtype=bool)
+        novo[1:] = (chaves[1:] != chaves[:-1]) | (documento[1:] != documento[:-1])
+        chaves, documento = chaves[novo], documento[novo]
+
+        inicio = np.flatnonzero(np.r_[True, chaves[1:] != chaves[:-1]]) if len(chaves) else np.empty(0, dtype=np.int64)
+        self._chaves = chaves[inicio]
+        self._limites = np.r_[inicio, len(chaves)]
+        self._documentos = documento
+        # Caracteres de cada trigrama, para os termos curtos
+        self._letras = [self._chaves >> 2 * _BITS, (self._chaves >> _BITS) & _MASCARA, self._chaves & _MASCARA]
+        # Textos curtos demais para ter trigrama
+        self._curtos = np.flatnonzero(tamanhos < 3)
+
+    def __len__(self):
+        return len(self._ids) + len(self._pendentes_ids)
+
+    def add(self, id_, texto):
+        with self._lock:
+            self._pendentes_ids.append(int(id_))
+            self._pendentes_textos.append(normalizar_termo(texto))
+            if len(self._pendentes_ids) > LIMITE_PENDENTES:
+                self._montar(
+                    np.r_[self._ids, np.array(self._pendentes_ids, dtype=np.int64)],
+                    np.r_[self._textos, np.array(self._pendentes_textos, dtype=object)],
+                )
+
+    def _lista(self, chave):
+        i = np.searchsorted(self._chaves, chave)
+        if i == len(self._chaves) or self._chaves[i] != chave:
+            return self._documentos[:0]
+        return self._documentos[self._limites[i]:self._limites[i + 1]]
+
+    def _documentos_termo_curto(self, termo):
+        """Textos com um termo de 1 ou 2 caracteres.
+
+        Toda ocorrência do termo num texto com 3 ou mais caracteres está em
+        algum trigrama, em alguma posição; os textos mais curtos são
+        conferidos um a um.
+        """
+        codigos = _code_points(termo)
+        casa = np.zeros(len(self._chaves), dtype=bool)
+        for deslocamento in range(3 - len(codigos) + 1):
+            parcial = np.ones(len(self._chaves), dtype=bool)
+            for j, c in enumerate(codigos):
+                parcial &= self._letras[deslocamento + j] == c
+            casa |= parcial
+        marcados = np.zeros(len(self._textos), dtype=bool)
+        for i in np.flatnonzero(casa):
+            marcados[self._documentos[self._limites[i]:self._limites[i + 1]]] = True
+        for d in self._curtos:
+            if termo in self._textos[d]:
+                marcados[d] = True
+        return np.flatnonzero(marcados)
+
+    def _documentos_com(self, termo):
+        if len(termo) < 3:
+            return self._documentos_termo_curto(termo)
+        codigos = _code_points(termo)
+        listas = sorted((self._lista(c) for c in np.unique(_trigramas(codigos))), key=len)
+        candidatos = listas[0]
+        for lista in listas[1:]:
+            if not len(candidatos):
+                break
+            pos = np.minimum(np.searchsorted(lista, candidatos), len(lista) - 1)
+            candidatos = candidatos[lista[pos] == candidatos]
+        if len(termo) > 3:
+            # Trigramas presentes fora de ordem não bastam: confere o trecho inteiro
+            if len(candidatos) > LIMITE_CONFERENCIA:
+                confere = pd.Series(self._textos[candidatos], dtype=object).str.contains(termo, regex=False)
+                candidatos = candidatos[confere.to_numpy(dtype=bool)]
+            else:
+                candidatos = candidatos[[termo in self._textos[d] for d in candidatos]]
+        return candidatos
+
+    def search(self, termo):
+        """IDs dos textos que contêm ``termo`` (já normalizado ou não)."""
+        termo = normalizar_termo(termo)
+        if not termo:
+            return np.empty(0, dtype=np.int64)
+        with self._lock:
+            ids = self._ids[self._documentos_com(termo)]
+            extras = [i for i, t in zip(self._pendentes_ids, self._pendentes_textos) if termo in t]
+        return np.r_[ids, np.array(extras, dtype=np.int64)] if extras else ids
+
+
+class PrefixIndex:
+    def __init__(self, ids, valores):
+        self._lock = threading.Lock()
+        valores = pd.Series(valores, dtype=object).fillna("").astype(str).to_numpy(dtype=str)
+        self._montar(np.asarray(ids, dtype=np.int64), valores)
+
+    def _montar(self, ids, valores):
+        ordem = np.argsort(valores, kind="stable")
+        self._valores = valores[ordem]
+        self._ids = ids[ordem]
+        self._brutos = valores
+        self._brutos_ids = ids
+        self._pendentes = []
+
+    def __len__(self):
+        return len(self._ids) + len(self._pendentes)
+
+    def add(self, id_, valor):
+        with self._lock:
+            self._pendentes.append((int(id_), str(valor or "")))
+            if len(self._pendentes) > LIMITE_PENDENTES:
+                ids, valores = zip(*self._pendentes)
+                self._montar(
+                    np.r_[self._brutos_ids, np.array(ids, dtype=np.int64)],
+                    np.r_[self._brutos, np.array(valores, dtype=str)],
+                )
+
+    def search(self, prefixo):
+        """IDs (ordenados) dos valores que começam com ``prefixo``."""
+        if not prefixo:
+            return np.empty(0, dtype=np.int64)
+        with self._lock:
+            inicio = np.searchsorted(self._valores, prefixo, side="left")
+            fim = np.searchsorted(self._valores, prefixo + "\U0010ffff", side="left")
+            ids = self._ids[inicio:fim]
+            extras = [i for i, v in self._pendentes if v.startswith(prefixo)]
+        return np.sort(np.r_[ids, np.array(extras, dtype=np.int64)])
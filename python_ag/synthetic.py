@@ -0,0 +1,247 @@
+"""Gerador paralelo de datasets sintéticos, compatíveis com o schema dos dashboards.
+
+    python -m python_ag.synthetic --linhas 100m --destino .cache/synthetic/100m
+    python -m python_ag.synthetic --linhas 1m --datasets vendas_loja_seminovos rent_a_car --formatos parquet
+
+Cada dataset é dividido em partes de ``LINHAS_POR_PARTE`` linhas, geradas em
+processos separados (``--processos``, padrão: todos os núcleos):
+
+- os CSVs do repositório (Cars, Parts e os três da oficina) são reamostrados
+  com reposição, com IDs renumerados e chaves estrangeiras sorteadas dentro
+  do intervalo de IDs da escala;
+- as tabelas da Rent a Car saem de ``rent_a_car.generate_data``, uma frota
+  independente por parte, com os IDs deslocados para não repetirem.
+
+Cada parte usa um gerador semeado por ``(seed, dataset, parte)``, e as
+locações terminam em ``--hoje`` (padrão: ``rent_a_car.DATA_REFERENCIA``),
+então o resultado não depende do número de processos nem do dia em que roda.
+Saída em ``--destino``:
+
+- ``<arquivo>.csv`` no formato da fonte original (separador, decimal, datas),
+  um arquivo por dataset: basta apontar ``PYTHON_AG_DATA_SOURCE`` para o
+  diretório. As partes são gravadas em paralelo e concatenadas no fim;
+- ``parquet/<dataset>/part-00000.parquet``: um diretório particionado por
+  dataset, legível com ``pd.read_parquet``;
+- ``rent_a_car/<tabela>.csv`` e ``parquet/rent_a_car/<tabela>/``, só para
+  benchmarks e análises fora do app: a página da Rent a Car não lê arquivos,
+  gera os dados no próprio processo (na escala de
+  ``PYTHON_AG_RENT_LOCACOES``, ver ``page_data``);
+- ``synthetic.json`` com os parâmetros e as linhas geradas.
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from python_ag import data_source, rent_a_car
+
+# Datasets reamostrados e a coluna de ID renumerada em cada um
+DATASETS = {
+    "vendas_loja_seminovos": "ID",
+    "vendas_acessorios_fake": None,
+    "clientes": "id_cliente",
+    "veiculos": "id_veiculo",
+    "agendamentos": "id_agendamento",
+}
+# Chaves estrangeiras sorteadas dentro do intervalo de IDs da escala
+CHAVES_ESTRANGEIRAS = {"veiculos": ["id_cliente"], "agendamentos": ["id_veiculo"]}
+RENT_A_CAR = "rent_a_car"
+TABELAS_RENT_A_CAR = ("clientes", "veiculos", "lojas", "locacoes", "marketing")
+# Proporções dos dados da página: 555 locações para 50 veículos e 100 clientes
+LOCACOES_POR_VEICULO = 11
+CLIENTES_POR_VEICULO = 2
+LINHAS_POR_PARTE = 1_000_000
+FORMATOS = ("csv", "parquet")
+
+
+def parse_escala(texto):
+    """``"10k"`` -> 10000, ``"1m"`` -> 1000000."""
+    texto = texto.strip().lower()
+    multiplicador = {"k": 1_000, "m": 1_000_000}.get(texto[-1:], 1)
+    return int(float(texto.rstrip("km")) * multiplicador)
+
+
+def _rng(seed, nome, parte):
+    return np.random.default_rng([seed, [*DATASETS, RENT_A_CAR].index(nome), parte])
+
+
+def _caminho_parte(destino, nome, formato, parte):
+    return Path(destino) / ".partes" / formato / nome / f"part-{parte:05d}.{formato}"
+
+
+def _gravar(df, destino, nome, parte, formatos, csv_kwargs=None):
+    """Grava a parte nos formatos pedidos (o CSV sem cabeçalho, exceto na parte 0)."""
+    if "parquet" in formatos:
+        caminho = Path(destino) / "parquet" / nome / f"part-{parte:05d}.parquet"
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(caminho, index=False)
+    if "csv" in formatos:
+        caminho = _caminho_parte(destino, nome, "csv", parte)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(caminho, header=parte == 0, index=False, **(csv_kwargs or {}))
+
+
+@lru_cache(maxsize=None)
+def _base(nome):
+    """CSV do repositório que serve de amostra (lido uma vez por processo)."""
+    dataset = data_source.DATASETS[nome]
+    return data_source.read_source(dataset, data_source.source_path(dataset, str(data_source.REPO_DIR / "pages")))
+
+
+def resample(nome, inicio, n, total, rng):
+    """Linhas ``inicio`` a ``inicio + n`` de ``nome`` reamostrado até ``total`` linhas."""
+    base = _base(nome)
+    bloco = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    id_col = DATASETS[nome]
+    if id_col:
+        bloco[id_col] = np.arange(inicio + 1, inicio + n + 1)
+    for col in CHAVES_ESTRANGEIRAS.get(nome, []):
+        bloco[col] = rng.integers(1, total + 1, n)
+    return bloco
+
+
+def _gerar_reamostrado(nome, parte, inicio, n, total, destino, formatos, seed):
+    dataset = data_source.DATASETS[nome]
+    bloco = resample(nome, inicio, n, total, _rng(seed, nome, parte))
+    _gravar(bloco, destino, nome, parte, formatos, {
+        "sep": dataset.sep, "decimal": dataset.decimal,
+        "date_format": next(iter(dataset.dates.values()), None),
+    })
+    return {nome: len(bloco)}
+
+
+def _veiculos_por_parte(locacoes):
+    return max(math.ceil(locacoes / LOCACOES_POR_VEICULO), 1)
+
+
+def rent_a_car_params(locacoes):
+    """Tamanho da frota e da base de clientes para ``locacoes`` locações, nas proporções da página."""
+    num_veiculos = _veiculos_por_parte(locacoes)
+    return {"num_clientes": num_veiculos * CLIENTES_POR_VEICULO, "num_veiculos": num_veiculos,
+            "num_locacoes": locacoes}
+
+
+def _gerar_rent_a_car(parte, inicio, n, destino, formatos, seed, hoje):
+    """Uma frota independente com ``n`` locações; IDs deslocados pela parte."""
+    # Só a última parte pode ser menor, então as anteriores têm o tamanho cheio
+    desloc_veiculos = parte * _veiculos_por_parte(LINHAS_POR_PARTE)
+    desloc_clientes = desloc_veiculos * CLIENTES_POR_VEICULO
+    dados = rent_a_car.generate_data(
+        seed=int(_rng(seed, RENT_A_CAR, parte).integers(2 ** 32)),
+        **rent_a_car_params(n), hoje=hoje, compact_dtypes=False,
+    )
+    dados["clientes"]["id_cliente"] += desloc_clientes
+    dados["veiculos"]["id_veiculo"] += desloc_veiculos
+    locacoes = dados["locacoes"]
+    locacoes["id_locacao"] += inicio
+    locacoes["id_cliente"] += desloc_clientes
+    locacoes["id_veiculo"] += desloc_veiculos
+    if parte:
+        # Lojas e marketing não dependem da escala: vão só na primeira parte
+        del dados["lojas"], dados["marketing"]
+
+    linhas = {}
+    for tabela, df in dados.items():
+        _gravar(df, destino, f"{RENT_A_CAR}/{tabela}", parte, formatos)
+        linhas[f"{RENT_A_CAR}/{tabela}"] = len(df)
+    return linhas
+
+
+def _juntar_csv(destino, nome, caminho):
+    """Concatena as partes CSV de ``nome`` em ``caminho``, em ordem."""
+    pasta = _caminho_parte(destino, nome, "csv", 0).parent
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho, "wb") as saida:
+        for parte in sorted(pasta.glob("part-*.csv")):
+            with open(parte, "rb") as entrada:
+                shutil.copyfileobj(entrada, saida, 16 * 2 ** 20)
+
+
+def _tarefas(nomes, linhas, destino, formatos, seed, hoje):
+    for nome in nomes:
+        for parte, inicio in enumerate(range(0, linhas, LINHAS_POR_PARTE)):
+            n = min(LINHAS_POR_PARTE, linhas - inicio)
+            if nome == RENT_A_CAR:
+                yield _gerar_rent_a_car, (parte, inicio, n, destino, formatos, seed, hoje)
+            else:
+                yield _gerar_reamostrado, (nome, parte, inicio, n, linhas, destino, formatos, seed)
+
+
+def generate(nomes, linhas, destino, formatos=FORMATOS, processos=None, seed=0, hoje=None):
+    """Gera ``linhas`` linhas de cada dataset em ``nomes`` (ou locações, para ``"rent_a_car"``).
+
+    Retorna o total de linhas gravadas por tabela.
+    """
+    destino = Path(destino)
+    hoje = hoje or rent_a_car.DATA_REFERENCIA
+    for formato in formatos:
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconhecido: {formato}")
+    shutil.rmtree(destino / ".partes", ignore_errors=True)
+    for nome in nomes:
+        shutil.rmtree(destino / "parquet" / nome, ignore_errors=True)
+
+    totais = {}
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count()) as pool:
+        futuros = [pool.submit(funcao, *args)
+                   for funcao, args in _tarefas(nomes, linhas, destino, formatos, seed, hoje)]
+        for futuro in futuros:
+            for tabela, n in futuro.result().items():
+                totais[tabela] = totais.get(tabela, 0) + n
+
+    if "csv" in formatos:
+        for tabela in totais:
+            if tabela in data_source.DATASETS:
+                caminho = destino / data_source.DATASETS[tabela].filename
+            else:
+                caminho = destino / f"{tabela}.csv"
+            _juntar_csv(destino, tabela, caminho)
+    shutil.rmtree(destino / ".partes", ignore_errors=True)
+    return totais
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m python_ag.synthetic",
+        description="Gera datasets sintéticos em qualquer escala, em paralelo.",
+    )
+    parser.add_argument("--linhas", default="1m", help="linhas por dataset (ex.: 10k, 1m, 100m)")
+    parser.add_argument("--destino", default=str(data_source.REPO_DIR / ".cache" / "synthetic"))
+    parser.add_argument("--datasets", nargs="*", default=[*DATASETS, RENT_A_CAR],
+                        choices=[*DATASETS, RENT_A_CAR])
+    parser.add_argument("--formatos", default=",".join(FORMATOS), help="csv, parquet ou ambos")
+    parser.add_argument("--processos", type=int, help="padrão: número de núcleos")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hoje", type=date.fromisoformat, default=rent_a_car.DATA_REFERENCIA,
+                        help="fim da janela das locações da Rent a Car (AAAA-MM-DD)")
+    args = parser.parse_args(argv)
+
+    linhas = parse_escala(args.linhas)
+    formatos = tuple(f.strip() for f in args.formatos.split(",") if f.strip())
+    inicio = time.perf_counter()
+    totais = generate(args.datasets, linhas, args.destino, formatos, args.processos, args.seed, args.hoje)
+    duracao = time.perf_counter() - inicio
+
+    Path(args.destino, "synthetic.json").write_text(json.dumps({
+        "linhas": linhas, "seed": args.seed, "hoje": args.hoje.isoformat(),
+        "datasets": args.datasets, "formatos": formatos,
+        "tabelas": totais, "segundos": round(duracao, 1),
+    }, indent=2, ensure_ascii=False))
+    for tabela, n in totais.items():
+        print(f"{tabela}: {n:,} linhas".replace(",", "."))
+    print(f"Gerado em {duracao:.1f}s em {args.destino}")
+    print(f"Para usar nos dashboards: PYTHON_AG_DATA_SOURCE={args.destino}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
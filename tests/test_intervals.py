@@ -0,0 +1,66 @@
+"""Índice de intervalos da Rent a Car: sobreposição e veículos ocupados, nas bordas."""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from python_ag.intervals import VehicleIntervals
+
+
+@pytest.fixture
+def indice():
+    locacoes = pd.DataFrame({
+        "id_veiculo": [1, 1, 2, 3],
+        "data_inicio": pd.to_datetime(["2024-01-10", "2024-01-20", "2024-01-15", "2024-01-05"]),
+        "data_fim": pd.to_datetime(["2024-01-15", "2024-01-25", None, "2024-01-06"]),
+    })
+    return VehicleIntervals.from_locacoes(locacoes)
+
+
+def test_intervalo_semiaberto(indice):
+    # [10, 15): o dia 15 já está livre, o 14 não
+    assert not indice.is_free(1, date(2024, 1, 14), date(2024, 1, 15))
+    assert indice.is_free(1, date(2024, 1, 15), date(2024, 1, 20))
+    assert indice.is_free(1, date(2024, 1, 5), date(2024, 1, 10))
+    assert not indice.is_free(1, date(2024, 1, 5), date(2024, 1, 11))
+    # Atravessa a locação seguinte inteira
+    assert not indice.is_free(1, date(2024, 1, 16), date(2024, 1, 30))
+
+
+def test_locacao_em_aberto(indice):
+    assert indice.is_free(2, date(2024, 1, 1), date(2024, 1, 15))
+    assert not indice.is_free(2, date(2030, 1, 1), date(2030, 1, 2))
+    assert not indice.is_free(2, date(2024, 1, 1))
+
+
+def test_veiculo_sem_locacao_esta_livre(indice):
+    assert indice.is_free(99, date(2024, 1, 1))
+    assert indice.free_vehicles([1, 2, 3, 99], date(2024, 1, 15), date(2024, 1, 20)) == [1, 3, 99]
+
+
+def test_veiculos_ocupados_nas_bordas(indice):
+    assert sorted(indice.busy_vehicles(date(2024, 1, 5))) == [3]
+    # Último dia de uma locação não conta (fim exclusivo)
+    assert sorted(indice.busy_vehicles(date(2024, 1, 6))) == []
+    assert sorted(indice.busy_vehicles(date(2024, 1, 14))) == [1]
+    assert sorted(indice.busy_vehicles(date(2024, 1, 15))) == [2]
+    assert sorted(indice.busy_vehicles(date(2024, 1, 24))) == [1, 2]
+    assert sorted(indice.busy_vehicles(date(2024, 1, 25))) == [2]
+
+
+def test_add_recusa_sobreposicao_e_aceita_encostada(indice):
+    with pytest.raises(ValueError):
+        indice.add(1, date(2024, 1, 14), date(2024, 1, 16))
+    with pytest.raises(ValueError):
+        indice.add(1, date(2024, 1, 12), date(2024, 1, 12))
+    indice.add(1, date(2024, 1, 15), date(2024, 1, 20))
+    assert not indice.is_free(1, date(2024, 1, 19))
+    assert len(indice) == 5
+
+
+def test_close_encerra_locacao_em_aberto(indice):
+    indice.close(2, date(2024, 1, 15), date(2024, 1, 18))
+    assert indice.is_free(2, date(2024, 1, 18))
+    assert not indice.is_free(2, date(2024, 1, 17), date(2024, 1, 18))
+    with pytest.raises(KeyError):
+        indice.close(2, date(2024, 1, 16), date(2024, 1, 18))
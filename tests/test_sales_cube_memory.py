@@ -0,0 +1,35 @@
+"""Pico de memória da montagem do cubo da Python Parts com um CSV grande.
+
+O cubo é montado como na página (``SalesCube.from_dataset``: CSV -> espelho
+em blocos -> leitura bloco a bloco) num processo separado, e o que o pico da
+memória residente desse processo cresce durante a ingestão precisa caber na
+margem dada, não importa quanto o processo já ocupava antes.
+"""
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+MARGEM_MB = 256
+# Carregado de uma vez, este volume passaria da margem (~160 B por linha tipada)
+LINHAS = 1_500_000
+
+
+def _rodar(*args):
+    return subprocess.run([sys.executable, "-m", *args], cwd=REPO_DIR, capture_output=True, text=True)
+
+
+def test_pico_de_memoria_dentro_da_margem(tmp_path):
+    # O CSV é gerado em outro processo, para não contar no pico medido
+    gerado = _rodar("python_ag.synthetic", "--linhas", str(LINHAS), "--datasets", "vendas_acessorios_fake",
+                    "--formatos", "csv", "--processos", "1", "--destino", str(tmp_path))
+    assert gerado.returncode == 0, gerado.stderr
+
+    resultado = _rodar("python_ag.sales_cube", str(tmp_path), "--max-memory-mb", str(MARGEM_MB))
+    medida = re.search(r"em (\d+) blocos .* pico de memória do processo: (\d+) MB, (\d+) MB antes", resultado.stdout)
+    assert medida, resultado.stdout + resultado.stderr
+    blocos, pico, base = map(int, medida.groups())
+    assert blocos > 1
+    assert pico - base <= MARGEM_MB
+    assert resultado.returncode == 0
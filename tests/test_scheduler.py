@@ -0,0 +1,84 @@
+"""Agenda dos boxes: encaixe nas bordas do dia e entre boxes, e box liberado quando a gravação falha."""
+from datetime import date, timedelta
+
+import pytest
+
+from python_ag.repair_shop import RepairShopDB
+from python_ag.scheduler import WorkshopSchedule
+
+INICIO = date(2024, 3, 4)
+
+
+@pytest.fixture
+def agenda():
+    # 08:00 às 18:00 em horários de 1 hora: 10 horários por box
+    return WorkshopSchedule(INICIO, dias=3, boxes=2)
+
+
+def test_fits_nas_bordas_do_expediente(agenda):
+    assert agenda.fits(INICIO, "08:00", "Revisão periódica")
+    assert agenda.fits(INICIO, "15:00:00", "Revisão periódica")
+    # Terminaria às 19:00
+    assert not agenda.fits(INICIO, "16:00", "Revisão periódica")
+    assert agenda.fits(INICIO, "17:00", "Troca de óleo")
+    assert not agenda.fits(INICIO, "18:00", "Troca de óleo")
+    assert not agenda.fits(INICIO, "07:00", "Troca de óleo")
+    assert not agenda.fits(INICIO, "08:30", "Troca de óleo")
+    # Fora do horizonte
+    assert not agenda.fits(INICIO - timedelta(days=1), "08:00", "Troca de óleo")
+    assert not agenda.fits(INICIO + timedelta(days=3), "08:00", "Troca de óleo")
+
+
+def test_book_usa_o_proximo_box_e_recusa_quando_todos_ocupados(agenda):
+    assert agenda.book(INICIO, "09:00", "Freios") == 0
+    assert agenda.book(INICIO, "10:00", "Troca de óleo") == 1
+    # 09:00-11:00 no box 0 e 10:00 no box 1: Freios às 10:00 não cabe em nenhum
+    assert not agenda.fits(INICIO, "10:00", "Freios")
+    with pytest.raises(ValueError):
+        agenda.book(INICIO, "10:00", "Freios")
+    assert agenda.fits(INICIO, "11:00", "Freios")
+    # 08:00 tem 1 hora livre no box 0 e 2 no box 1: Suspensão (3 horas) não cabe
+    assert agenda.free_starts(INICIO, "Suspensão") == ["11:00", "12:00", "13:00", "14:00", "15:00"]
+
+
+def test_next_free_atravessa_boxes_e_dias(agenda):
+    assert agenda.next_free("Revisão periódica") == (INICIO, "08:00", 0)
+    # Box 0 sem 3 horas seguidas no primeiro dia (só 17:00 livre): a vaga seguinte é no box 1
+    agenda.book(INICIO, "08:00", "Revisão periódica")
+    agenda.book(INICIO, "11:00", "Revisão periódica")
+    agenda.book(INICIO, "14:00", "Revisão periódica")
+    assert agenda.next_free("Revisão periódica") == (INICIO, "08:00", 1)
+    assert agenda.next_free("Troca de óleo", horario="17:00") == (INICIO, "17:00", 0)
+    # Box 1 ocupado até 17:00: não há mais 3 horas seguidas no dia
+    agenda.book(INICIO, "08:00", "Revisão periódica")
+    agenda.book(INICIO, "11:00", "Revisão periódica")
+    agenda.book(INICIO, "14:00", "Revisão periódica")
+    assert agenda.next_free("Revisão periódica") == (INICIO + timedelta(days=1), "08:00", 0)
+    assert agenda.next_free("Troca de óleo") == (INICIO, "17:00", 0)
+    # Depois das 17:00 só no dia seguinte; depois do último dia, nada
+    assert agenda.next_free("Freios", horario="16:00") == (INICIO + timedelta(days=1), "08:00", 0)
+    assert agenda.next_free("Freios", dia=INICIO + timedelta(days=2), horario="17:00") is None
+
+
+def test_free_slots_e_release(agenda):
+    assert agenda.free_slots(INICIO) == 20
+    box = agenda.book(INICIO, "16:00", "Freios")
+    agenda.book(INICIO, "16:00", "Troca de óleo")
+    assert agenda.free_slots(INICIO) == 17
+    # Outros dias não mudam
+    assert agenda.free_slots(INICIO + timedelta(days=1)) == 20
+    assert list(agenda.free_capacity(dias=3)) == [17, 20, 20]
+    agenda.release(INICIO, "16:00", "Freios", box)
+    assert agenda.free_slots(INICIO) == 19
+    assert agenda.book(INICIO, "16:00", "Freios") == box
+
+
+def test_box_liberado_quando_a_gravacao_falha(tmp_path):
+    db = RepairShopDB(tmp_path / "oficina.sqlite3")
+    amanha = date.today() + timedelta(days=1)
+    livres = db.agenda_oficina().free_slots(amanha)
+    with pytest.raises(ValueError):
+        db.add_agendamento(1, amanha, "08:00", "Freios", "não é número", "")
+    assert db.agenda_oficina().free_slots(amanha) == livres
+    db.add_agendamento(1, amanha, "08:00", "Freios", 100, "")
+    assert db.agenda_oficina().free_slots(amanha) == livres - 2
@@ -0,0 +1,66 @@
+"""Índices de busca dos cadastros: trigramas, termos curtos, prefixos e inserções."""
+import pytest
+
+from python_ag import search_index
+from python_ag.search_index import NgramIndex, PrefixIndex
+
+
+@pytest.fixture
+def nomes():
+    return NgramIndex([10, 20, 30, 40, 50], ["João da Silva", "Maria Souza", "Ana", "Al", None])
+
+
+def _ids(resultado):
+    return sorted(int(i) for i in resultado)
+
+
+def test_trigramas_sem_acento_nem_caixa(nomes):
+    assert _ids(nomes.search("silva")) == [10]
+    assert _ids(nomes.search("JOÃO")) == [10]
+    assert _ids(nomes.search("joao da s")) == [10]
+    assert _ids(nomes.search("sou")) == [20]
+    assert _ids(nomes.search("xyz")) == []
+
+
+def test_trigramas_fora_de_ordem_nao_casam():
+    # Todos os trigramas de "alvess" estão no texto, mas não o trecho
+    indice = NgramIndex([1], ["Alves Vessoni"])
+    assert _ids(indice.search("alves")) == [1]
+    assert _ids(indice.search("alvess")) == []
+
+
+def test_termos_curtos(nomes):
+    # Dois caracteres: no começo, no meio e no fim dos textos, e nos textos curtos
+    assert _ids(nomes.search("an")) == [30]
+    assert _ids(nomes.search("al")) == [40]
+    assert _ids(nomes.search("va")) == [10]
+    assert _ids(nomes.search("a")) == [10, 20, 30, 40]
+    assert _ids(nomes.search("ã")) == [10, 20, 30, 40]
+    assert _ids(nomes.search("")) == []
+
+
+def test_conferencia_pelo_pandas(monkeypatch, nomes):
+    monkeypatch.setattr(search_index, "LIMITE_CONFERENCIA", 0)
+    assert _ids(nomes.search("da silva")) == [10]
+
+
+def test_add_antes_e_depois_de_incorporar(monkeypatch, nomes):
+    nomes.add(60, "Luíza Andrade")
+    assert _ids(nomes.search("luiza")) == [60]
+    assert _ids(nomes.search("an")) == [30, 60]
+    monkeypatch.setattr(search_index, "LIMITE_PENDENTES", 1)
+    nomes.add(70, "Bruno Andrade")
+    assert _ids(nomes.search("andrade")) == [60, 70]
+    assert _ids(nomes.search("an")) == [30, 60, 70]
+    assert len(nomes) == 7
+
+
+def test_prefixo():
+    cpfs = PrefixIndex([1, 2, 3, 4], ["12345678901", "12399999999", "98765432100", None])
+    assert _ids(cpfs.search("123")) == [1, 2]
+    assert _ids(cpfs.search("1234")) == [1]
+    assert _ids(cpfs.search("12345678901")) == [1]
+    assert _ids(cpfs.search("2345")) == []
+    assert _ids(cpfs.search("")) == []
+    cpfs.add(5, "12300000000")
+    assert _ids(cpfs.search("123")) == [1, 2, 5]